@@ -0,0 +1,117 @@
+"""
+Role-based access control
+Roles (user, analyst, admin) map to a fixed set of permissions that is
+computed once at import, so a permission check is a single set lookup.
+
+Row-level scoping is compiled once per (role, table) into a SQL fragment
+such as "reported_by = ?", which the incident and ticket queries append
+to their WHERE clause. The scoped columns are indexed (SCHEMA_INDEXES in
+app/data/schema.py), so a scoped query is an index search rather than a
+table scan.
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+# Authenticated caller passed to data functions
+Principal = namedtuple("Principal", ["username", "role"])
+
+ROLES = ("user", "analyst", "admin")
+
+ALL_PERMISSIONS = frozenset({
+    "incidents:read", "incidents:create", "incidents:update", "incidents:delete",
+    "tickets:read", "tickets:create", "tickets:update", "tickets:delete",
+    "datasets:read", "datasets:write",
+    "exports:run",
+})
+
+# Precomputed role -> permission matrix
+ROLE_PERMISSIONS = {
+    "user": frozenset({
+        "incidents:read", "incidents:create",
+        "tickets:read", "tickets:create",
+    }),
+    "analyst": frozenset({
+        "incidents:read", "incidents:create", "incidents:update",
+        "tickets:read", "tickets:create", "tickets:update",
+        "datasets:read",
+        "exports:run",
+    }),
+    "admin": ALL_PERMISSIONS,
+}
+
+# Column that owns each row, per role and table. Roles/tables not listed
+# here see every row.
+ROW_SCOPES = {
+    "user": {
+        "cyber_incidents": "reported_by",
+        "it_tickets": "assigned_to",
+    },
+    "analyst": {
+        "cyber_incidents": "reported_by",
+        "it_tickets": "assigned_to",
+    },
+}
+
+
+def has_permission(principal, permission):
+    """Return True if the principal's role grants the permission."""
+    return permission in ROLE_PERMISSIONS.get(principal.role, frozenset())
+
+
+def require_permission(principal, permission):
+    """
+    Raise PermissionError unless the principal holds the permission.
+
+    A principal of None means an internal/system caller and is allowed.
+    """
+    if principal is None or has_permission(principal, permission):
+        return
+    raise PermissionError(f"Role '{principal.role}' lacks permission '{permission}'")
+
+
+@lru_cache(maxsize=None)
+def _compiled_row_filter(role, table):
+    """Compile the row filter of a role on a table (None = unrestricted)."""
+    if role not in ROLE_PERMISSIONS:
+        # Unknown roles see nothing rather than everything
+        return "0"
+    column = ROW_SCOPES.get(role, {}).get(table)
+    return f"{column} = ?" if column else None
+
+
+def row_filter(principal, table):
+    """
+    Return the row-level filter for a principal on a table.
+
+    Returns:
+        tuple: (sql_fragment or None, params)
+    """
+    if principal is None:
+        return None, ()
+    fragment = _compiled_row_filter(principal.role, table)
+    if fragment is None or "?" not in fragment:
+        return fragment, ()
+    return fragment, (principal.username,)
+
+
+def scoped_where(principal, table, conditions=(), params=()):
+    """
+    Build a WHERE clause from fixed conditions plus the principal's row filter.
+
+    Args:
+        principal: Principal or None
+        table: Table being queried
+        conditions: SQL conditions that always apply
+        params: Parameters for those conditions
+
+    Returns:
+        tuple: (" WHERE ..." or "", params)
+    """
+    fragment, filter_params = row_filter(principal, table)
+    clauses = list(conditions)
+    if fragment is not None:
+        clauses.append(fragment)
+    if not clauses:
+        return "", tuple(params)
+    return " WHERE " + " AND ".join(clauses), tuple(params) + filter_params
@@ -0,0 +1,176 @@
+"""
+Query result cache
+Keeps recent analytic query results in memory so repeated dashboard
+refreshes with the same arguments do not go back to SQLite.
+
+Each cached result is keyed by (databases, function, params) and is tagged
+with the generation counter of every table it reads. Write paths call
+bump_table_generation() for the tables they touch, so any result built
+from an older generation is treated as stale and recomputed.
+
+Generation counters only see writes made through this process's write
+paths. Commits made any other way (another process, or raw SQL on another
+connection) are caught with PRAGMA data_version, which changes for a
+connection whenever some other connection has committed to the database:
+when a connection sees a new value, or is seen for the first time, every
+result cached for that database is treated as stale.
+"""
+
+import inspect
+import itertools
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+# Maximum number of results kept before the least recently used is evicted
+MAX_CACHE_ENTRIES = 128
+
+# Connections whose last data_version is remembered; past this the record
+# is reset, which only costs one extra miss per connection
+MAX_TRACKED_CONNECTIONS = 256
+
+_cache = OrderedDict()
+_generations = {}
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+# (database key, connection token) -> last data_version values seen
+_data_versions = {}
+# database key -> number of outside commits noticed so far
+_outside_changes = {}
+_connection_tokens = itertools.count(1)
+
+
+def bump_table_generation(*tables):
+    """
+    Mark one or more tables as changed.
+
+    Args:
+        tables: Names of the tables that were written to
+    """
+    with _lock:
+        for table in tables:
+            _generations[table] = _generations.get(table, 0) + 1
+
+
+def get_table_generation(table):
+    """Return the current generation counter of a table."""
+    with _lock:
+        return _generations.get(table, 0)
+
+
+def clear_query_cache():
+    """Drop every cached result and reset the hit/miss counters."""
+    with _lock:
+        _cache.clear()
+        for name in _stats:
+            _stats[name] = 0
+
+
+def get_cache_stats():
+    """
+    Return cache counters.
+
+    Returns:
+        dict: hits, misses, evictions and current size
+    """
+    with _lock:
+        return dict(_stats, size=len(_cache))
+
+
+def _database_key(conn):
+    """
+    Identify the database files behind a connection.
+
+    Attached databases are part of the key: a connection with partitions
+    attached (see enable_partitioning() in db.py) reads the _all views and
+    must not share results with one that only sees the main tables.
+    """
+    # Rows of (seq, name, file); the temp schema holds no table data
+    return tuple(
+        (name, path or f"memory:{id(conn)}")
+        for _, name, path in conn.execute("PRAGMA database_list")
+        if name != "temp"
+    )
+
+
+def _connection_token(conn):
+    """
+    Return a number identifying this connection for its lifetime.
+
+    id(conn) can be reused once a connection is closed, so the token is
+    stored in the connection's own temp database header (user_version of
+    the temp schema starts at 0 for every new connection).
+    """
+    token = conn.execute("PRAGMA temp.user_version").fetchone()[0]
+    if token == 0:
+        token = next(_connection_tokens)
+        conn.execute(f"PRAGMA temp.user_version = {token}")
+    return token
+
+
+def _outside_generation(conn, database):
+    """
+    Return the outside-commit counter of a database, first bumping it if
+    this connection's PRAGMA data_version changed since its last call.
+    """
+    versions = tuple(
+        conn.execute(f'PRAGMA "{name}".data_version').fetchone()[0] for name, _ in database
+    )
+    seen_key = (database, _connection_token(conn))
+    with _lock:
+        if _data_versions.get(seen_key) != versions:
+            if len(_data_versions) >= MAX_TRACKED_CONNECTIONS:
+                _data_versions.clear()
+            _data_versions[seen_key] = versions
+            _outside_changes[database] = _outside_changes.get(database, 0) + 1
+        return _outside_changes[database]
+
+
+def cached_query(*tables):
+    """
+    Decorator that caches a pandas-returning query function.
+
+    The wrapped function must take the connection as its first argument.
+    The cached DataFrame is copied on the way out so callers can modify
+    their result without corrupting the cache.
+
+    Args:
+        tables: Tables the query reads from
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(conn, *args, **kwargs):
+            # Normalise positional/keyword/default arguments into one key
+            bound = signature.bind(conn, *args, **kwargs)
+            bound.apply_defaults()
+            params = tuple(bound.arguments.items())[1:]
+            database = _database_key(conn)
+            key = (database, func.__qualname__, params)
+            outside = _outside_generation(conn, database)
+
+            with _lock:
+                generations = tuple(_generations.get(t, 0) for t in tables) + (outside,)
+                entry = _cache.get(key)
+                if entry is not None and entry[0] == generations:
+                    _cache.move_to_end(key)
+                    _stats["hits"] += 1
+                    return entry[1].copy()
+                _stats["misses"] += 1
+
+            result = func(conn, *args, **kwargs)
+
+            with _lock:
+                _cache[key] = (generations, result)
+                _cache.move_to_end(key)
+                while len(_cache) > MAX_CACHE_ENTRIES:
+                    _cache.popitem(last=False)
+                    _stats["evictions"] += 1
+
+            return result.copy()
+
+        wrapper.cache_tables = tables
+        return wrapper
+    return decorator
@@ -0,0 +1,288 @@
+"""
+Datasets catalog and column profiling
+Registers the CSV file behind each dataset and profiles it in streaming
+chunks: per-column null counts, HyperLogLog distinct-count estimates,
+min/max and a histogram built from a uniform sample. Results are stored in
+dataset_column_stats and only recomputed when the file's fingerprint
+(size + modification time) changes. Several datasets are profiled in
+parallel worker processes.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from app.data.schema import create_all_tables
+
+# Rows read per pandas chunk while profiling
+PROFILE_CHUNK_SIZE = 50000
+
+# HyperLogLog precision: 2**12 registers, ~1.6% standard error
+HLL_PRECISION = 12
+
+# Values kept per column for histograms
+SAMPLE_SIZE = 10000
+HISTOGRAM_BINS = 10
+TOP_VALUES = 10
+
+
+# ---------------------- HYPERLOGLOG ----------------------
+def _hll_add(registers, hashes):
+    """Fold 64-bit hashes into HLL registers (vectorized)."""
+    import numpy as np
+
+    p = HLL_PRECISION
+    index = (hashes >> np.uint64(64 - p)).astype(np.int64)
+    rest = hashes & np.uint64((1 << (64 - p)) - 1)
+
+    # Exact bit length of the remaining bits via a binary search over shifts
+    bit_length = np.zeros(len(rest), dtype=np.int64)
+    value = rest.copy()
+    for shift in (32, 16, 8, 4, 2, 1):
+        mask = value >= np.uint64(1 << shift)
+        bit_length[mask] += shift
+        value[mask] >>= np.uint64(shift)
+    bit_length += (value > 0)
+
+    rank = (64 - p) - bit_length + 1
+    np.maximum.at(registers, index, rank.astype(registers.dtype))
+
+
+def _hll_estimate(registers):
+    """Return the HLL cardinality estimate with small-range correction."""
+    import numpy as np
+
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(2.0 ** -registers.astype(np.float64))
+
+    zeros = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and zeros:
+        estimate = m * np.log(m / zeros)
+    return int(round(estimate))
+
+
+# ---------------------- PROFILING ----------------------
+def file_fingerprint(path):
+    """Return a cheap fingerprint of a file (size and mtime)."""
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def profile_csv(csv_path, chunksize=PROFILE_CHUNK_SIZE):
+    """
+    Profile a CSV file in one streaming pass.
+
+    Args:
+        csv_path: Path to the CSV file
+        chunksize: Rows per chunk
+
+    Returns:
+        dict: {"row_count": int, "columns": [per-column stats dicts]}
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng()
+    stats = {}
+    row_count = 0
+
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        row_count += len(chunk)
+
+        for position, name in enumerate(chunk.columns):
+            series = chunk[name]
+            column = stats.get(name)
+            if column is None:
+                column = stats[name] = {
+                    "position": position,
+                    "numeric": True,
+                    "nulls": 0,
+                    "registers": np.zeros(1 << HLL_PRECISION, dtype=np.uint8),
+                    "num_min": None, "num_max": None,
+                    "str_min": None, "str_max": None,
+                    "sample": None, "sample_keys": None,
+                }
+
+            column["nulls"] += int(series.isna().sum())
+            values = series.dropna()
+            if values.empty:
+                continue
+
+            text = values.astype(str)
+            _hll_add(column["registers"], pd.util.hash_pandas_object(text, index=False).to_numpy())
+
+            if column["numeric"] and pd.api.types.is_numeric_dtype(values) \
+                    and not pd.api.types.is_bool_dtype(values):
+                low, high = float(values.min()), float(values.max())
+                column["num_min"] = low if column["num_min"] is None else min(column["num_min"], low)
+                column["num_max"] = high if column["num_max"] is None else max(column["num_max"], high)
+            else:
+                column["numeric"] = False
+
+            low, high = text.min(), text.max()
+            column["str_min"] = low if column["str_min"] is None else min(column["str_min"], low)
+            column["str_max"] = high if column["str_max"] is None else max(column["str_max"], high)
+
+            # Bottom-k sampling: keep the rows with the smallest random keys,
+            # which is a uniform sample over everything seen so far
+            keys = rng.random(len(text))
+            sample = text.to_numpy(dtype=object)
+            if column["sample"] is not None:
+                keys = np.concatenate([column["sample_keys"], keys])
+                sample = np.concatenate([column["sample"], sample])
+            if len(keys) > SAMPLE_SIZE:
+                keep = np.argpartition(keys, SAMPLE_SIZE)[:SAMPLE_SIZE]
+                keys, sample = keys[keep], sample[keep]
+            column["sample_keys"], column["sample"] = keys, sample
+
+    columns = []
+    for name, column in stats.items():
+        numeric = column["numeric"] and column["num_min"] is not None
+        columns.append({
+            "column_name": name,
+            "position": column["position"],
+            "inferred_type": "numeric" if numeric else "text",
+            "null_count": column["nulls"],
+            "distinct_estimate": _hll_estimate(column["registers"]),
+            "min_value": column["num_min"] if numeric else column["str_min"],
+            "max_value": column["num_max"] if numeric else column["str_max"],
+            "histogram": _histogram(column["sample"], numeric),
+        })
+
+    return {"row_count": row_count, "columns": columns}
+
+
+def _histogram(sample, numeric):
+    """Summarise a column sample as bin counts (numeric) or top values (text)."""
+    import numpy as np
+    import pandas as pd
+
+    if sample is None or len(sample) == 0:
+        return None
+
+    if numeric:
+        counts, edges = np.histogram(sample.astype(np.float64), bins=HISTOGRAM_BINS)
+        return {"sample_size": len(sample), "edges": edges.tolist(), "counts": counts.tolist()}
+
+    top = pd.Series(sample).value_counts().head(TOP_VALUES)
+    return {"sample_size": len(sample), "top_values": {str(k): int(v) for k, v in top.items()}}
+
+
+# ---------------------- CATALOG ----------------------
+def register_dataset_file(conn, dataset_id, csv_path):
+    """
+    Link a dataset (datasets_metadata.dataset_id) to the CSV file holding it.
+
+    Args:
+        conn: Database connection
+        dataset_id: Dataset identifier
+        csv_path: Path to the dataset's CSV file
+    """
+    create_all_tables(conn)
+    conn.execute(
+        """
+        INSERT INTO dataset_files (dataset_id, path) VALUES (?, ?)
+        ON CONFLICT(dataset_id) DO UPDATE SET
+            path = excluded.path,
+            fingerprint = CASE WHEN path = excluded.path THEN fingerprint END
+        """,
+        (str(dataset_id), str(csv_path))
+    )
+    conn.commit()
+
+
+def _store_profile(conn, dataset_id, fingerprint, profile):
+    conn.execute("DELETE FROM dataset_column_stats WHERE dataset_id = ?", (dataset_id,))
+    conn.executemany(
+        """
+        INSERT INTO dataset_column_stats
+        (dataset_id, column_name, position, inferred_type, null_count,
+         distinct_estimate, min_value, max_value, histogram)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                dataset_id, c["column_name"], c["position"], c["inferred_type"],
+                c["null_count"], c["distinct_estimate"],
+                None if c["min_value"] is None else str(c["min_value"]),
+                None if c["max_value"] is None else str(c["max_value"]),
+                None if c["histogram"] is None else json.dumps(c["histogram"]),
+            )
+            for c in profile["columns"]
+        ]
+    )
+    conn.execute(
+        """
+        UPDATE dataset_files
+        SET fingerprint = ?, row_count = ?, profiled_at = CURRENT_TIMESTAMP
+        WHERE dataset_id = ?
+        """,
+        (fingerprint, profile["row_count"], dataset_id)
+    )
+    conn.commit()
+
+
+def profile_datasets(conn, dataset_ids=None, force=False, max_workers=None):
+    """
+    Profile registered datasets whose files changed since the last run.
+
+    Args:
+        conn: Database connection
+        dataset_ids: Optional list of dataset ids (default: all registered)
+        force: Re-profile even if the fingerprint is unchanged
+        max_workers: Worker processes (default: one per CPU)
+
+    Returns:
+        list: Dataset ids that were (re)profiled
+    """
+    create_all_tables(conn)
+    rows = conn.execute("SELECT dataset_id, path, fingerprint FROM dataset_files").fetchall()
+    if dataset_ids is not None:
+        wanted = {str(d) for d in dataset_ids}
+        rows = [row for row in rows if row[0] in wanted]
+
+    stale = []
+    for dataset_id, path, stored in rows:
+        if not os.path.exists(path):
+            print(f" Dataset file not found: {path}")
+            continue
+        fingerprint = file_fingerprint(path)
+        if force or fingerprint != stored:
+            stale.append((dataset_id, path, fingerprint))
+
+    if not stale:
+        return []
+
+    paths = [path for _, path, _ in stale]
+    if len(stale) == 1:
+        profiles = [profile_csv(paths[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            profiles = list(pool.map(profile_csv, paths))
+
+    for (dataset_id, path, fingerprint), profile in zip(stale, profiles):
+        _store_profile(conn, dataset_id, fingerprint, profile)
+        print(f" Profiled dataset {dataset_id}: {profile['row_count']} rows, "
+              f"{len(profile['columns'])} columns")
+
+    return [dataset_id for dataset_id, _, _ in stale]
+
+
+def get_column_stats(conn, dataset_id):
+    """
+    Return the stored column statistics of a dataset.
+
+    Returns:
+        pandas.DataFrame: One row per column, histogram as JSON text
+    """
+    import pandas as pd
+
+    query = """
+    SELECT column_name, inferred_type, null_count, distinct_estimate,
+           min_value, max_value, histogram
+    FROM dataset_column_stats
+    WHERE dataset_id = ?
+    ORDER BY position
+    """
+    return pd.read_sql_query(query, conn, params=(str(dataset_id),))
@@ -0,0 +1,158 @@
+"""
+Change-data-capture log consumer API
+Every insert/update/delete on cyber_incidents and it_tickets is appended
+to change_log by triggers (see install_change_triggers in schema.py).
+change_log.seq comes from an AUTOINCREMENT key, so it is strictly
+increasing and never reused, even after compaction deletes old rows.
+
+Consumers read changes after their last checkpoint, process them, then
+commit the highest seq they handled:
+
+    for change in poll_changes(conn, "dashboard"):
+        ...
+    commit_checkpoint(conn, "dashboard", change["seq"])
+"""
+
+import json
+import time
+
+# Changes returned per poll
+DEFAULT_POLL_LIMIT = 1000
+
+
+def read_changes(conn, after_seq=0, limit=DEFAULT_POLL_LIMIT, tables=None):
+    """
+    Read changes with seq greater than after_seq, oldest first.
+
+    Args:
+        conn: Database connection
+        after_seq: Last sequence number already seen
+        limit: Maximum number of changes to return
+        tables: Optional list of table names to include
+
+    Returns:
+        list: dicts with seq, table, op ('I', 'U', 'D'), key (the row's
+        incident_id / ticket_id), row_id, data (row image) and changed_at
+    """
+    query = ("SELECT seq, table_name, op, row_key, row_id, payload, changed_at "
+             "FROM change_log WHERE seq > ?")
+    params = [after_seq]
+    if tables:
+        query += f" AND table_name IN ({', '.join('?' for _ in tables)})"
+        params += list(tables)
+    query += " ORDER BY seq LIMIT ?"
+    params.append(limit)
+
+    return [
+        {
+            "seq": seq,
+            "table": table,
+            "op": op,
+            "key": row_key,
+            "row_id": row_id,
+            "data": json.loads(payload) if payload else None,
+            "changed_at": changed_at,
+        }
+        for seq, table, op, row_key, row_id, payload, changed_at in conn.execute(query, params)
+    ]
+
+
+def get_checkpoint(conn, consumer):
+    """Return the last committed seq of a consumer (0 if new)."""
+    row = conn.execute(
+        "SELECT last_seq FROM cdc_checkpoints WHERE consumer = ?", (consumer,)
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def commit_checkpoint(conn, consumer, seq):
+    """Record that a consumer has processed every change up to seq."""
+    conn.execute(
+        """
+        INSERT INTO cdc_checkpoints (consumer, last_seq) VALUES (?, ?)
+        ON CONFLICT(consumer) DO UPDATE SET
+            last_seq = MAX(last_seq, excluded.last_seq),
+            updated_at = CURRENT_TIMESTAMP
+        """,
+        (consumer, seq)
+    )
+    conn.commit()
+
+
+def poll_changes(conn, consumer, limit=DEFAULT_POLL_LIMIT, tables=None):
+    """Return the next changes after a consumer's checkpoint."""
+    return read_changes(conn, get_checkpoint(conn, consumer), limit, tables)
+
+
+def tail_changes(conn, consumer, poll_interval=1.0, limit=DEFAULT_POLL_LIMIT,
+                 tables=None, stop_event=None):
+    """
+    Yield batches of new changes forever (or until stop_event is set).
+
+    The checkpoint is committed after the caller has finished with each
+    batch, i.e. when the generator is resumed, so a crash while handling
+    a batch re-delivers it instead of losing it.
+
+    Args:
+        conn: Database connection
+        consumer: Consumer name used for the checkpoint
+        poll_interval: Seconds to sleep when there is nothing new
+        limit: Maximum changes per batch
+        tables: Optional list of table names to include
+        stop_event: Optional threading.Event that ends the loop
+    """
+    while stop_event is None or not stop_event.is_set():
+        batch = poll_changes(conn, consumer, limit, tables)
+        if not batch:
+            if stop_event is not None:
+                stop_event.wait(poll_interval)
+            else:
+                time.sleep(poll_interval)
+            continue
+
+        yield batch
+        commit_checkpoint(conn, consumer, batch[-1]["seq"])
+
+
+def compact_change_log(conn, upto_seq=None):
+    """
+    Compact the log up to a sequence number.
+
+    Within the compacted range only the latest image of each row (by its
+    natural key) is kept, and rows whose latest change is a delete are
+    dropped entirely, so a new consumer can still rebuild current state
+    from seq 0. Changes after upto_seq are never touched.
+
+    Args:
+        conn: Database connection
+        upto_seq: Last seq to compact; defaults to the lowest consumer
+            checkpoint so no registered consumer misses a change
+
+    Returns:
+        int: Number of change rows removed
+    """
+    if upto_seq is None:
+        row = conn.execute("SELECT MIN(last_seq) FROM cdc_checkpoints").fetchone()
+        upto_seq = row[0] or 0
+    if upto_seq <= 0:
+        return 0
+
+    # SQLite takes the bare "op" column from the row holding MAX(seq), so
+    # the subquery lists the latest change of every row that still exists.
+    # Rows without a key (NULL incident_id) fall back to their rowid.
+    cursor = conn.execute(
+        """
+        DELETE FROM change_log
+        WHERE seq <= :upto
+          AND seq NOT IN (
+            SELECT MAX(seq) FROM change_log
+            WHERE seq <= :upto
+            GROUP BY table_name, COALESCE(row_key, 'rowid:' || row_id)
+            HAVING op != 'D'
+          )
+        """,
+        {"upto": upto_seq}
+    )
+    conn.commit()
+    print(f" Compacted change log up to seq {upto_seq}: removed {cursor.rowcount} entries")
+    return cursor.rowcount
@@ -0,0 +1,201 @@
+"""
+Incident <-> ticket correlation
+Links every cyber incident to the IT tickets created within a time window
+around it and stores the pairs in incident_ticket_links, keyed by
+incident_id with a secondary index on ticket_id, so both directions are
+index lookups.
+
+rebuild_correlations() never compares every incident with every ticket.
+Ticket times are sorted once; the window edges of all incidents are then
+found with a vectorized binary search (numpy.searchsorted) and the
+matching ticket ranges are expanded block by block, so the cost is
+O((N + M) log M + pairs) instead of O(N x M). Incidents are processed
+in incident_id order so links are appended in primary key order, and the
+ticket_id index is rebuilt once at the end instead of row by row.
+
+With partitioning enabled, incidents and tickets are read from the
+cyber_incidents_all / it_tickets_all views (see partitioned_source() in
+app/data/db.py).
+"""
+
+import time
+
+from app.data.cache import bump_table_generation
+from app.data.access import require_permission, scoped_where
+from app.data.db import partitioned_source
+from app.data.schema import INCIDENT_TICKET_LINKS_INDEX_SQL
+
+# Default window around an incident, in seconds
+DEFAULT_WINDOW_BEFORE = 3600
+DEFAULT_WINDOW_AFTER = 3600
+
+# Incidents expanded into pairs per insert batch
+CORRELATION_BLOCK_SIZE = 10000
+
+
+def _load_times(conn, query):
+    """Return (ids, epoch seconds) for rows with a parseable time."""
+    import numpy as np
+    import pandas as pd
+
+    rows = conn.execute(query).fetchall()
+    if not rows:
+        return np.array([], dtype=object), np.array([], dtype=np.int64)
+
+    frame = pd.DataFrame.from_records(rows, columns=["id", "time"])
+    parsed = pd.to_datetime(frame["time"], errors="coerce", format="ISO8601")
+    valid = parsed.notna().to_numpy()
+    seconds = parsed[valid].to_numpy().astype("datetime64[s]").astype(np.int64)
+    return frame["id"].to_numpy(dtype=object)[valid], seconds
+
+
+def window_ranges(conn, before=DEFAULT_WINDOW_BEFORE, after=DEFAULT_WINDOW_AFTER):
+    """
+    Find, for every incident, the range of tickets inside its time window.
+
+    Returns:
+        tuple: (incident_ids, incident_times, ticket_ids, ticket_times,
+        lo, counts) where incident i matches tickets lo[i]:lo[i] + counts[i]
+        of the time-sorted ticket arrays
+    """
+    import numpy as np
+
+    # Tickets in time order, read from the covering idx_it_tickets_created_at;
+    # the stable sort only fixes rows whose text format sorts differently
+    ticket_ids, ticket_times = _load_times(
+        conn,
+        f"SELECT ticket_id, created_at FROM {partitioned_source(conn, 'it_tickets')} "
+        "WHERE created_at IS NOT NULL ORDER BY created_at"
+    )
+    order = np.argsort(ticket_times, kind="stable")
+    ticket_ids, ticket_times = ticket_ids[order], ticket_times[order]
+
+    # Incidents in key order, so links are appended in primary key order
+    incident_ids, incident_times = _load_times(
+        conn,
+        f"SELECT incident_id, timestamp FROM {partitioned_source(conn, 'cyber_incidents')} "
+        "WHERE incident_id IS NOT NULL AND timestamp IS NOT NULL ORDER BY incident_id"
+    )
+
+    lo = np.searchsorted(ticket_times, incident_times - before, side="left")
+    hi = np.searchsorted(ticket_times, incident_times + after, side="right")
+    return incident_ids, incident_times, ticket_ids, ticket_times, lo, hi - lo
+
+
+def rebuild_correlations(conn, before=DEFAULT_WINDOW_BEFORE, after=DEFAULT_WINDOW_AFTER,
+                         block_size=CORRELATION_BLOCK_SIZE):
+    """
+    Recompute incident_ticket_links from scratch.
+
+    A ticket is linked to an incident when it was created between
+    `before` seconds before and `after` seconds after the incident.
+
+    Args:
+        conn: Database connection
+        before: Seconds before the incident timestamp to include
+        after: Seconds after the incident timestamp to include
+        block_size: Incidents expanded per insert batch
+
+    Returns:
+        int: Number of links stored
+    """
+    import numpy as np
+
+    start = time.perf_counter()
+    incident_ids, incident_times, ticket_ids, ticket_times, lo, counts = \
+        window_ranges(conn, before, after)
+
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    try:
+        conn.execute("DROP INDEX IF EXISTS idx_incident_ticket_links_ticket")
+        conn.execute("DELETE FROM incident_ticket_links")
+        for first in range(0, len(incident_ids), block_size):
+            block = slice(first, first + block_size)
+            block_counts = counts[block]
+            total = int(block_counts.sum())
+            if total == 0:
+                continue
+
+            # Expand each incident's [lo, hi) ticket range into pair indexes
+            incident_index = np.repeat(np.arange(first, first + len(block_counts)), block_counts)
+            offsets = np.repeat(lo[block] - (np.cumsum(block_counts) - block_counts), block_counts)
+            ticket_index = offsets + np.arange(total)
+            lags = ticket_times[ticket_index] - incident_times[incident_index]
+
+            conn.executemany(
+                "INSERT OR IGNORE INTO incident_ticket_links (incident_id, ticket_id, lag_seconds) "
+                "VALUES (?, ?, ?)",
+                zip(incident_ids[incident_index].tolist(),
+                    ticket_ids[ticket_index].tolist(),
+                    lags.tolist())
+            )
+        conn.execute(INCIDENT_TICKET_LINKS_INDEX_SQL)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    bump_table_generation("incident_ticket_links")
+    links = int(counts.sum())
+    print(f" Correlated {len(incident_ids)} incidents with {len(ticket_ids)} tickets: "
+          f"{links} links in {time.perf_counter() - start:.2f}s")
+    return links
+
+
+def get_tickets_for_incident(conn, incident_id, principal=None):
+    """
+    Return the tickets linked to an incident, closest in time first.
+
+    Args:
+        conn: Database connection
+        incident_id: Incident to look up
+        principal: Optional caller; needs 'incidents:read' and
+            'tickets:read', and only sees tickets in its scope
+
+    Returns:
+        pandas.DataFrame: Ticket rows plus lag_seconds (ticket time minus
+        incident time)
+    """
+    import pandas as pd
+
+    require_permission(principal, "incidents:read")
+    require_permission(principal, "tickets:read")
+    where, params = scoped_where(principal, "it_tickets", ["l.incident_id = ?"], (str(incident_id),))
+
+    query = f"""
+    SELECT t.*, l.lag_seconds
+    FROM incident_ticket_links l
+    JOIN {partitioned_source(conn, 'it_tickets')} t ON t.ticket_id = l.ticket_id{where}
+    ORDER BY ABS(l.lag_seconds)
+    """
+    return pd.read_sql_query(query, conn, params=params)
+
+
+def get_incidents_for_ticket(conn, ticket_id, principal=None):
+    """
+    Return the incidents linked to a ticket, closest in time first.
+
+    Args:
+        conn: Database connection
+        ticket_id: Ticket to look up
+        principal: Optional caller; needs 'incidents:read' and
+            'tickets:read', and only sees incidents in its scope
+
+    Returns:
+        pandas.DataFrame: Incident rows plus lag_seconds (ticket time minus
+        incident time)
+    """
+    import pandas as pd
+
+    require_permission(principal, "incidents:read")
+    require_permission(principal, "tickets:read")
+    where, params = scoped_where(principal, "cyber_incidents", ["l.ticket_id = ?"], (str(ticket_id),))
+
+    query = f"""
+    SELECT i.*, l.lag_seconds
+    FROM incident_ticket_links l
+    JOIN {partitioned_source(conn, 'cyber_incidents')} i ON i.incident_id = l.incident_id{where}
+    ORDER BY ABS(l.lag_seconds)
+    """
+    return pd.read_sql_query(query, conn, params=params)
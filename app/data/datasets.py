@@ -1,14 +1,42 @@
 import os
-import pandas as pd
 
-def load_csv_to_table(conn, csv_path, table_name):
+from app.data.cache import bump_table_generation
+from app.data.planner import record_bulk_change
+from app.data.validation import (
+    TABLE_RULES, key_strings, load_existing_keys, quarantine_rows, validate_chunk,
+)
+
+# Rows read and validated per chunk when loading CSVs
+LOAD_CHUNK_SIZE = 50000
+
+DATA_DIR = "DATA"
+
+# Source CSV of each table
+CSV_FILES = {
+    "cyber_incidents": os.path.join(DATA_DIR, "cyber_incidents.csv"),
+    "datasets_metadata": os.path.join(DATA_DIR, "datasets_metadata.csv"),
+    "it_tickets": os.path.join(DATA_DIR, "it_tickets.csv"),
+}
+
+def load_csv_to_table(conn, csv_path, table_name, chunksize=LOAD_CHUNK_SIZE):
     """
     Load a CSV file into a database table using pandas.
 
+    The file is read in chunks and every chunk is validated (see
+    app/data/validation.py). Valid rows are appended to the table;
+    invalid rows are stored in ingest_quarantine with their reasons, so
+    one bad row no longer stops the rest of the file.
+
+    Rows whose key is already stored in the table are skipped, so
+    re-loading a CSV (every run of main.py, or a CSV that has grown) only
+    inserts the new rows. Only a key repeated within the file itself is
+    quarantined as a duplicate.
+
     Args:
         conn: Database connection
         csv_path: Path to CSV file
         table_name: Name of the target table
+        chunksize: Rows read and validated per chunk
 
     Returns:
         int: Number of rows loaded
@@ -19,34 +47,81 @@ def load_csv_to_table(conn, csv_path, table_name):
         print(f" CSV not found: {csv_path}")
         return 0
 
-    # 2. Read CSV using pandas
+    # 2. Read CSV using pandas (imported here to keep module import cheap)
+    import pandas as pd
+
+    source = os.path.basename(csv_path)
+    existing_keys = load_existing_keys(conn, table_name)
+    # Keys inserted from this file so far
+    seen_keys = set()
+    key = TABLE_RULES.get(table_name, {}).get("key")
+    loaded = 0
+    quarantined = 0
+    skipped = 0
+
     try:
-        df = pd.read_csv(csv_path)
+        chunks = pd.read_csv(csv_path, chunksize=chunksize)
+
+        for chunk in chunks:
+            if existing_keys and key in chunk.columns:
+                already = key_strings(chunk[key]).isin(existing_keys)
+                skipped += int(already.sum())
+                chunk = chunk[~already]
+
+            # 3. Validate, then insert good rows using to_sql
+            valid, rejected = validate_chunk(chunk, table_name, seen_keys)
+            quarantined += quarantine_rows(conn, table_name, source, rejected)
+
+            if valid.empty:
+                continue
+            try:
+                valid.to_sql(
+                    name=table_name,
+                    con=conn,
+                    if_exists='append',
+                    index=False
+                )
+                loaded += len(valid)
+                if key in valid.columns:
+                    seen_keys.update(valid[key].dropna())
+            except Exception:
+                # Retry row by row so only the offending rows are quarantined
+                conn.rollback()
+                for i in range(len(valid)):
+                    row = valid.iloc[i:i + 1]
+                    try:
+                        row.to_sql(name=table_name, con=conn, if_exists='append', index=False)
+                        loaded += 1
+                        if key in row.columns:
+                            seen_keys.update(row[key].dropna())
+                    except Exception as e:
+                        conn.rollback()
+                        quarantined += quarantine_rows(
+                            conn, table_name, source, row.assign(reasons=f"insert failed: {e}")
+                        )
     except Exception as e:
         print(f" Error reading CSV {csv_path}: {e}")
-        return 0
 
-    # If CSV is empty
-    if df.empty:
-        print(f" CSV is empty: {csv_path}")
+    # If CSV had nothing to load
+    if loaded == 0 and quarantined == 0:
+        if skipped:
+            print(f" No new rows in {csv_path}")
+        else:
+            print(f" CSV is empty: {csv_path}")
         return 0
 
-    # 3. Insert into SQL using to_sql
-    try:
-        df.to_sql(
-            name=table_name,
-            con=conn,
-            if_exists='append',
-            index=False
-        )
-    except Exception as e:
-        print(f" Error inserting into table '{table_name}': {e}")
-        return 0
+    # Invalidate cached query results that read from this table
+    if loaded:
+        bump_table_generation(table_name)
 
     # 4. Print success message
-    print(f" Loaded {len(df)} rows into '{table_name}' from {os.path.basename(csv_path)}")
+    print(f" Loaded {loaded} rows into '{table_name}' from {source}"
+          + (f" ({quarantined} quarantined)" if quarantined else ""))
 
-    return len(df)
+    # Refresh planner statistics once enough rows have changed
+    record_bulk_change(conn, table_name, loaded)
+
+    return loaded
 
 def load_all_csv_data(conn):
     """
@@ -54,17 +129,9 @@ def load_all_csv_data(conn):
     Returns the total number of rows inserted.
     """
 
-    DATA_DIR = "DATA"
-
-    csv_mapping = {
-        "cyber_incidents": os.path.join(DATA_DIR, "cyber_incidents.csv"),
-        "datasets_metadata": os.path.join(DATA_DIR, "datasets_metadata.csv"),
-        "it_tickets": os.path.join(DATA_DIR, "it_tickets.csv")
-    }
-
     total_rows = 0
 
-    for table, csv_path in csv_mapping.items():
+    for table, csv_path in CSV_FILES.items():
         print(f"\n Loading CSV: {csv_path} → Table: {table}")
         rows = load_csv_to_table(conn, csv_path, table)
         total_rows += rows
@@ -72,3 +139,30 @@ def load_all_csv_data(conn):
     print(f"\n TOTAL CSV ROWS LOADED: {total_rows}")
     return total_rows
 
+
+def refresh_csv_data(conn, fingerprints):
+    """
+    Load new rows from CSV files that changed since the last refresh.
+
+    Args:
+        conn: Database connection
+        fingerprints: dict of table -> file fingerprint from the previous
+            call; updated in place (start with an empty dict)
+
+    Returns:
+        int: Number of rows loaded
+    """
+    total_rows = 0
+
+    for table, csv_path in CSV_FILES.items():
+        if not os.path.exists(csv_path):
+            continue
+        stat = os.stat(csv_path)
+        fingerprint = f"{stat.st_size}:{stat.st_mtime_ns}"
+        if fingerprints.get(table) == fingerprint:
+            continue
+
+        total_rows += load_csv_to_table(conn, csv_path, table)
+        fingerprints[table] = fingerprint
+
+    return total_rows
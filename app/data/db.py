@@ -1,6 +1,10 @@
+import re
 import sqlite3
 from pathlib import Path
 
+from app.data.cache import bump_table_generation
+from app.data.schema import CDC_TABLES, install_change_triggers
+
 # Location of your SQLite database
 DB_PATH = Path("DATA") / "intelligence_platform.db"
 
@@ -25,4 +29,436 @@ def connect_database(db_path=DB_PATH):
     # Enable foreign keys (SQLite does NOT enable them by default)
     conn.execute("PRAGMA foreign_keys = ON;")
 
+    # Only takes effect on a new, empty database; see run_maintenance()
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL;")
+
     return conn
+
+
+def next_numeric_id(conn, source, column):
+    """
+    Return one more than the highest all-digit value of a TEXT id column
+    (the CSV files number incidents and tickets 1000, 1001, ...).
+    """
+    return str(conn.execute(
+        f"SELECT COALESCE(MAX(CAST({column} AS INTEGER)), 0) + 1 FROM {source} "
+        f"WHERE {column} GLOB '[0-9]*' AND {column} NOT GLOB '*[^0-9]*'"
+    ).fetchone()[0])
+
+
+# ---------------------- MAINTENANCE ----------------------
+# Free pages handed back to the filesystem per maintenance run
+INCREMENTAL_VACUUM_PAGES = 2000
+
+
+def run_maintenance(conn, vacuum_pages=INCREMENTAL_VACUUM_PAGES):
+    """
+    Refresh planner statistics and release free pages.
+
+    PRAGMA optimize re-runs ANALYZE on tables whose statistics are stale.
+    A database created before incremental auto-vacuum was enabled is
+    converted with one full VACUUM; after that each run only frees up to
+    vacuum_pages pages, which is cheap enough to do while serving.
+
+    Args:
+        conn: Database connection
+        vacuum_pages: Maximum free pages to release
+
+    Returns:
+        int: Number of pages released
+    """
+    conn.commit()
+    conn.execute("PRAGMA optimize")
+
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        print(" Enabling incremental auto-vacuum (one-time full VACUUM)")
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+
+    free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    # The pragma frees pages step by step; fetchall() runs it to completion
+    conn.execute(f"PRAGMA incremental_vacuum({int(vacuum_pages)})").fetchall()
+    freed = free_before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+    print(f" Maintenance done: statistics refreshed, {freed} pages released")
+    return freed
+
+
+# ---------------------- PARTITIONED STORAGE ----------------------
+# Incidents and tickets can be stored in per-year SQLite files that are
+# ATTACHed to the main connection. Each partition file holds both tables
+# for one year, e.g. DATA/partitions/p2024.db, so old years can be
+# backed up, VACUUMed or archived without touching the hot database.
+#
+# Every hot partition on disk must be attached for the <table>_all views
+# to be complete, so nothing is ever detached implicitly: once the attach
+# limit is reached, attaching another partition raises and the oldest
+# years have to be archived with archive_partition() first. Partitioning
+# is per connection: every connection that writes to a partitioned table
+# must call enable_partitioning(), which also installs the TEMP triggers
+# that log changes and keep keys unique across all partitions.
+
+PARTITION_DIR = Path("DATA") / "partitions"
+ARCHIVE_DIR = PARTITION_DIR / "archive"
+
+# Partitioned tables and the timestamp column that picks their year
+PARTITIONED_TABLES = {
+    "cyber_incidents": "timestamp",
+    "it_tickets": "created_at",
+}
+
+# SQLite allows at most 10 attached databases per connection (compile-time
+# limit). One slot is kept free for ad-hoc ATTACHes such as backups.
+MAX_ATTACHED_PARTITIONS = 9
+
+_PARTITION_NAME = re.compile(r"^p\d{4}$")
+
+
+def partition_for(value):
+    """
+    Return the partition name for a timestamp value.
+
+    Args:
+        value: Timestamp string starting with YYYY
+
+    Returns:
+        str or None: Partition name like 'p2024', or None when the value
+        has no usable date (those rows stay in the main database)
+    """
+    if not value or len(str(value)) < 4:
+        return None
+    name = f"p{str(value)[:4]}"
+    return name if _PARTITION_NAME.match(name) else None
+
+
+def list_partitions(partition_dir=PARTITION_DIR):
+    """Return the names of all partition files on disk, oldest first."""
+    if not partition_dir.exists():
+        return []
+    return sorted(p.stem for p in partition_dir.glob("p*.db") if _PARTITION_NAME.match(p.stem))
+
+
+def attached_partitions(conn):
+    """Return the names of the partitions attached to this connection."""
+    rows = conn.execute("PRAGMA database_list").fetchall()
+    return sorted(row[1] for row in rows if _PARTITION_NAME.match(row[1]))
+
+
+def partitioning_enabled(conn, table="cyber_incidents"):
+    """Return True if this connection reads a table through its _all view."""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_temp_master WHERE type = 'view' AND name = ?", (f"{table}_all",)
+    ).fetchone() is not None
+
+
+def partitioned_source(conn, table):
+    """Return the table or view that reads of a partitioned table should use."""
+    return f"{table}_all" if partitioning_enabled(conn, table) else table
+
+
+def partition_schemas(conn, table):
+    """
+    Return the quoted schema names that hold rows of a table: 'main'
+    plus, with partitioning enabled, every attached partition.
+
+    The _all views cannot be written to, so updates and deletes run once
+    per schema (each key lives in exactly one of them).
+    """
+    if not partitioning_enabled(conn, table):
+        return ["main"]
+    return ["main"] + [f'"{p}"' for p in attached_partitions(conn)]
+
+
+def _enabled_partition_dir(conn, partition_dir=None):
+    """
+    Return partition_dir, or else the folder enable_partitioning() used
+    on this connection, or else PARTITION_DIR.
+    """
+    if partition_dir is not None:
+        return partition_dir
+    try:
+        row = conn.execute("SELECT path FROM temp.partition_settings").fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    return Path(row[0]) if row else PARTITION_DIR
+
+
+def _columns(conn, schema, table):
+    """Return (name, type, notnull, default) of each column of a table."""
+    return [row[1:5] for row in conn.execute(f'PRAGMA "{schema}".table_info({table})')]
+
+
+def _create_partition_tables(conn, partition):
+    """
+    Copy the main schema of each partitioned table into a partition:
+    the table (plus columns added to main since the partition was
+    created) and its indexes.
+    """
+    for table in PARTITIONED_TABLES:
+        row = conn.execute(
+            "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?",
+            (table,)
+        ).fetchone()
+        if row is None:
+            continue
+        create_sql = re.sub(
+            rf"^CREATE TABLE\s+(?:IF NOT EXISTS\s+)?\"?{table}\"?",
+            f'CREATE TABLE IF NOT EXISTS "{partition}".{table}',
+            row[0],
+            count=1,
+        )
+        conn.execute(create_sql)
+
+        existing = {column[0] for column in _columns(conn, partition, table)}
+        for name, column_type, notnull, default in _columns(conn, "main", table):
+            if name not in existing:
+                conn.execute(
+                    f'ALTER TABLE "{partition}".{table} ADD COLUMN {name} {column_type}'
+                    + (" NOT NULL" if notnull else "")
+                    + (f" DEFAULT {default}" if default is not None else "")
+                )
+
+        indexes = conn.execute(
+            "SELECT sql FROM main.sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+            (table,)
+        ).fetchall()
+        for (index_sql,) in indexes:
+            conn.execute(re.sub(
+                r"^CREATE\s+(UNIQUE\s+)?INDEX\s+(?:IF NOT EXISTS\s+)?",
+                lambda m: f'CREATE {m.group(1) or ""}INDEX IF NOT EXISTS "{partition}".',
+                index_sql,
+                count=1,
+            ))
+
+
+def _drop_partition_triggers(conn, schema):
+    """Drop the TEMP triggers installed on the tables of one database."""
+    names = conn.execute(
+        "SELECT name FROM sqlite_temp_master WHERE type = 'trigger' AND name LIKE ?",
+        (f"trg_{schema}_%",)
+    ).fetchall()
+    for (name,) in names:
+        conn.execute(f"DROP TRIGGER IF EXISTS temp.{name}")
+
+
+def _install_partition_triggers(conn, schema):
+    """
+    Install the TEMP triggers of one database's partitioned tables.
+
+    Partition tables get the change-data-capture triggers (logging into
+    main.change_log like the main tables do). Main and partition tables
+    get triggers that reject a key already stored in any partition, since
+    each file's UNIQUE index only sees its own rows.
+    """
+    for table in PARTITIONED_TABLES:
+        key = CDC_TABLES[table]
+        if schema != "main":
+            install_change_triggers(conn, table, schema)
+
+        duplicate = (
+            f"NEW.{key} IS NOT NULL AND EXISTS "
+            f"(SELECT 1 FROM temp.{table}_all WHERE {key} = NEW.{key})"
+        )
+        for suffix, event, condition in (
+            ("unique_i", "INSERT ON", duplicate),
+            ("unique_u", f"UPDATE OF {key} ON", f"NEW.{key} IS NOT OLD.{key} AND {duplicate}"),
+        ):
+            name = f"trg_{schema}_{table}_{suffix}"
+            conn.execute(f"DROP TRIGGER IF EXISTS temp.{name}")
+            conn.execute(f"""
+            CREATE TEMP TRIGGER {name}
+            BEFORE {event} "{schema}".{table}
+            WHEN {condition}
+            BEGIN
+                SELECT RAISE(ABORT, 'UNIQUE constraint failed: {table}.{key}');
+            END
+            """)
+
+
+def refresh_partition_views(conn):
+    """
+    (Re)create the <table>_all views over the main table and every
+    attached partition using UNION ALL, and the TEMP triggers that go
+    with them.
+
+    The views and triggers are TEMP because SQLite only lets temporary
+    objects reference attached databases.
+    """
+    partitions = attached_partitions(conn)
+    for table in PARTITIONED_TABLES:
+        # Explicit columns, so a partition whose columns were added in a
+        # different order still lines up with main
+        columns = ", ".join(column[0] for column in _columns(conn, "main", table))
+        selects = [f"SELECT {columns} FROM main.{table}"]
+        selects += [f'SELECT {columns} FROM "{p}".{table}' for p in partitions]
+        conn.execute(f"DROP VIEW IF EXISTS temp.{table}_all")
+        conn.execute(f"CREATE TEMP VIEW {table}_all AS {' UNION ALL '.join(selects)}")
+
+    for schema in ["main"] + partitions:
+        _install_partition_triggers(conn, schema)
+    bump_table_generation(*PARTITIONED_TABLES)
+
+
+def attach_partition(conn, partition, partition_dir=None):
+    """
+    Attach a partition file, creating it if needed.
+
+    Args:
+        conn: Database connection
+        partition: Partition name from partition_for()
+        partition_dir: Folder holding partition files (defaults to the
+            one partitioning was enabled with)
+
+    Raises:
+        RuntimeError: When MAX_ATTACHED_PARTITIONS are already attached;
+            the oldest partitions must be archived first
+    """
+    if not _PARTITION_NAME.match(partition):
+        raise ValueError(f"Invalid partition name: {partition}")
+
+    attached = attached_partitions(conn)
+    if partition in attached:
+        return
+
+    if len(attached) >= MAX_ATTACHED_PARTITIONS:
+        raise RuntimeError(
+            f"Cannot attach partition {partition}: {len(attached)} partitions are already "
+            f"attached (limit {MAX_ATTACHED_PARTITIONS}); archive the oldest with archive_partition()"
+        )
+
+    # ATTACH is not allowed inside a transaction
+    conn.commit()
+    partition_dir = _enabled_partition_dir(conn, partition_dir)
+    partition_dir.mkdir(parents=True, exist_ok=True)
+    conn.execute(
+        f'ATTACH DATABASE ? AS "{partition}"',
+        (str(partition_dir / f"{partition}.db"),)
+    )
+    _create_partition_tables(conn, partition)
+    conn.commit()
+    refresh_partition_views(conn)
+
+
+def enable_partitioning(conn, partition_dir=PARTITION_DIR):
+    """
+    Attach every hot partition on disk and create the _all views.
+
+    Raises:
+        RuntimeError: When there are more hot partitions than
+            MAX_ATTACHED_PARTITIONS (nothing is attached in that case)
+
+    Returns:
+        list: Names of the attached partitions
+    """
+    partitions = list_partitions(partition_dir)
+    missing = [p for p in partitions if p not in attached_partitions(conn)]
+    if len(attached_partitions(conn)) + len(missing) > MAX_ATTACHED_PARTITIONS:
+        raise RuntimeError(
+            f"{len(partitions)} partitions in {partition_dir} exceed the attach limit "
+            f"({MAX_ATTACHED_PARTITIONS}); archive the oldest with archive_partition()"
+        )
+
+    # Remembered so later routed inserts on this connection use the same folder
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS partition_settings (path TEXT NOT NULL)")
+    conn.execute("DELETE FROM temp.partition_settings")
+    conn.execute("INSERT INTO temp.partition_settings (path) VALUES (?)", (str(partition_dir),))
+    conn.commit()
+
+    for partition in missing:
+        attach_partition(conn, partition, partition_dir)
+    refresh_partition_views(conn)
+    return attached_partitions(conn)
+
+
+def partition_schema(conn, table, row, partition_dir=None):
+    """
+    Attach the partition that owns a row and return its schema name.
+
+    Call outside a transaction (a new partition has to be ATTACHed).
+    Partitioning is enabled on conn first if it was not yet.
+
+    Returns:
+        str: Quoted schema name to insert into ('main' for rows without
+        a usable timestamp)
+    """
+    if table not in PARTITIONED_TABLES:
+        raise ValueError(f"Table '{table}' is not partitioned")
+    partition_dir = _enabled_partition_dir(conn, partition_dir)
+    if not partitioning_enabled(conn, table):
+        enable_partitioning(conn, partition_dir)
+
+    partition = partition_for(row.get(PARTITIONED_TABLES[table]))
+    if partition is None:
+        return "main"
+    attach_partition(conn, partition, partition_dir)
+    return f'"{partition}"'
+
+
+def partition_insert_sql(schema, table, columns):
+    """Build the INSERT statement for a row in one partition."""
+    placeholders = ", ".join("?" for _ in columns)
+    return f"INSERT INTO {schema}.{table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+
+def insert_partitioned(conn, table, row, partition_dir=None):
+    """
+    Insert a row into the partition that owns its timestamp.
+
+    Args:
+        conn: Database connection
+        table: One of PARTITIONED_TABLES
+        row: dict of column -> value
+        partition_dir: Folder holding partition files (defaults to the
+            one partitioning was enabled with)
+
+    Raises:
+        sqlite3.IntegrityError: When the row's key is already stored in
+            any partition
+
+    Returns:
+        str: Name of the database the row was written to ('main' or a
+        partition name)
+    """
+    schema = partition_schema(conn, table, row, partition_dir)
+
+    columns = list(row)
+    try:
+        conn.execute(partition_insert_sql(schema, table, columns), tuple(row[c] for c in columns))
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    bump_table_generation(table)
+    return schema.strip('"')
+
+
+def detach_partition(conn, partition):
+    """Detach a partition from this connection and refresh the views."""
+    if partition in attached_partitions(conn):
+        conn.commit()
+        _drop_partition_triggers(conn, partition)
+        conn.execute(f'DETACH DATABASE "{partition}"')
+        refresh_partition_views(conn)
+
+
+def archive_partition(conn, partition, partition_dir=PARTITION_DIR, archive_dir=ARCHIVE_DIR):
+    """
+    Detach a partition and move its file into the archive folder.
+
+    Hot data in the main database and other partitions is not touched.
+
+    Returns:
+        Path or None: New location of the partition file
+    """
+    detach_partition(conn, partition)
+
+    source = partition_dir / f"{partition}.db"
+    if not source.exists():
+        print(f" Partition not found: {source}")
+        return None
+
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    target = archive_dir / source.name
+    source.replace(target)
+    print(f" Archived partition {partition} → {target}")
+    return target
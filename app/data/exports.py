@@ -0,0 +1,214 @@
+"""
+Streaming table exports
+Writes cyber_incidents, it_tickets or datasets_metadata to CSV or JSONL
+(optionally gzip-compressed) without loading the table into memory.
+
+Rows are read in rowid order, one short keyset query per batch
+("WHERE rowid > last ORDER BY rowid LIMIT n"), so the export never holds
+a long read transaction that would block writers. Output goes to
+<dest>.part and is renamed into place only when complete. After every
+batch a small checkpoint (<dest>.part.json) records the last exported
+rowid and the byte offset of the .part file, so an interrupted export
+resumes where it stopped instead of starting over.
+
+With partitioning enabled, a partitioned table is exported from main and
+then from each attached partition in turn (rowids are per database, so
+the checkpoint also records which one the export had reached).
+
+Note: rowids of these tables can be renumbered by VACUUM, so do not
+VACUUM between an interrupted export and its resume.
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import time
+
+from app.data.access import require_permission, row_filter
+from app.data.db import PARTITIONED_TABLES, partition_schemas
+
+EXPORTABLE_TABLES = ("cyber_incidents", "it_tickets", "datasets_metadata")
+
+# Rows fetched and written per batch
+EXPORT_BATCH_SIZE = 5000
+
+
+def _detect_format(dest_path):
+    """Return (format, gzip?) from the destination file name."""
+    name = str(dest_path).lower()
+    compress = name.endswith(".gz")
+    if compress:
+        name = name[:-3]
+    if name.endswith(".jsonl"):
+        return "jsonl", compress
+    if name.endswith(".csv"):
+        return "csv", compress
+    raise ValueError(f"Cannot infer export format from '{dest_path}' (use .csv, .jsonl, optionally .gz)")
+
+
+def _encode_batch(rows, columns, fmt, header):
+    """Encode a batch of rows as CSV or JSONL bytes."""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if header:
+            writer.writerow(columns)
+        writer.writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+
+    lines = [json.dumps(dict(zip(columns, row)), default=str) for row in rows]
+    return ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
+
+
+def _load_checkpoint(checkpoint_path, options):
+    """Return a saved checkpoint if it belongs to the same export."""
+    if not os.path.exists(checkpoint_path):
+        return None
+    try:
+        with open(checkpoint_path, "r") as f:
+            checkpoint = json.load(f)
+    except ValueError:
+        return None
+    return checkpoint if checkpoint.get("options") == options else None
+
+
+def _save_checkpoint(checkpoint_path, checkpoint):
+    tmp_path = checkpoint_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def export_table(conn, table, dest_path, columns=None, where=None, params=(),
+                 batch_size=EXPORT_BATCH_SIZE, resume=True, principal=None):
+    """
+    Stream a table to a CSV/JSONL file with bounded memory.
+
+    Args:
+        conn: Database connection
+        table: One of EXPORTABLE_TABLES
+        dest_path: Output file; the format comes from the suffix
+            (.csv, .jsonl, .csv.gz, .jsonl.gz)
+        columns: Optional list of columns to export (default: all)
+        where: Optional SQL filter, e.g. "severity = ?"
+        params: Parameters for the filter
+        batch_size: Rows per batch
+        resume: Continue an interrupted export of the same table/options
+        principal: Optional caller; needs 'exports:run' and only its own
+            rows are exported for roles with a row scope
+
+    Returns:
+        dict: rows, bytes, seconds and rows_per_sec of this run
+    """
+    if table not in EXPORTABLE_TABLES:
+        raise ValueError(f"Table '{table}' cannot be exported")
+
+    require_permission(principal, "exports:run")
+    scope, scope_params = row_filter(principal, table)
+    if scope is not None:
+        where = f"({where}) AND {scope}" if where else scope
+        params = tuple(params) + scope_params
+
+    fmt, compress = _detect_format(dest_path)
+
+    table_columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+    columns = list(columns) if columns else table_columns
+    unknown = [c for c in columns if c not in table_columns]
+    if unknown:
+        raise ValueError(f"Unknown column(s) for {table}: {', '.join(unknown)}")
+
+    schemas = partition_schemas(conn, table) if table in PARTITIONED_TABLES else ["main"]
+
+    dest_path = str(dest_path)
+    part_path = dest_path + ".part"
+    checkpoint_path = part_path + ".json"
+    options = {"table": table, "columns": columns, "where": where, "params": list(params),
+               "schemas": schemas}
+
+    checkpoint = _load_checkpoint(checkpoint_path, options) if resume else None
+    if checkpoint is None or not os.path.exists(part_path):
+        checkpoint = {"options": options, "schema": schemas[0], "last_rowid": None, "rows": 0, "offset": 0}
+
+    start = time.perf_counter()
+    rows_written = 0
+    bytes_written = 0
+
+    with open(part_path, "r+b" if checkpoint["offset"] else "wb") as out:
+        # Drop anything written after the last checkpoint
+        out.truncate(checkpoint["offset"])
+        out.seek(checkpoint["offset"])
+
+        for schema in schemas[schemas.index(checkpoint["schema"]):]:
+            last_rowid = checkpoint["last_rowid"] if schema == checkpoint["schema"] else None
+
+            query = f"SELECT rowid, {', '.join(columns)} FROM {schema}.{table} WHERE rowid > ?"
+            if where:
+                query += f" AND ({where})"
+            query += " ORDER BY rowid LIMIT ?"
+
+            while True:
+                batch = conn.execute(
+                    query,
+                    (-1 if last_rowid is None else last_rowid, *params, batch_size)
+                ).fetchall()
+                header = fmt == "csv" and checkpoint["offset"] == 0
+                if not batch and not header:
+                    break
+
+                data = _encode_batch([row[1:] for row in batch], columns, fmt, header)
+                if compress:
+                    # One gzip member per batch keeps every checkpoint offset a
+                    # valid end of file; concatenated members are valid gzip
+                    data = gzip.compress(data)
+
+                out.write(data)
+                out.flush()
+
+                if batch:
+                    last_rowid = batch[-1][0]
+                rows_written += len(batch)
+                bytes_written += len(data)
+                checkpoint.update(
+                    schema=schema,
+                    last_rowid=last_rowid,
+                    rows=checkpoint["rows"] + len(batch),
+                    offset=checkpoint["offset"] + len(data),
+                )
+                _save_checkpoint(checkpoint_path, checkpoint)
+
+                if len(batch) < batch_size:
+                    break
+
+        os.fsync(out.fileno())
+
+    os.replace(part_path, dest_path)
+    os.remove(checkpoint_path)
+
+    seconds = time.perf_counter() - start
+    rate = rows_written / seconds if seconds > 0 else 0.0
+    print(f" Exported {checkpoint['rows']} rows from '{table}' to {os.path.basename(dest_path)} "
+          f"({rows_written} this run, {rate:,.0f} rows/s, {bytes_written / 2**20:.1f} MiB)")
+
+    return {
+        "rows": rows_written,
+        "total_rows": checkpoint["rows"],
+        "bytes": bytes_written,
+        "seconds": seconds,
+        "rows_per_sec": rate,
+    }
+
+
+def export_all_tables(conn, dest_dir, fmt="csv.gz"):
+    """
+    Export every exportable table into dest_dir as <table>.<fmt>.
+
+    Returns:
+        dict: table -> export stats
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    return {
+        table: export_table(conn, table, os.path.join(dest_dir, f"{table}.{fmt}"))
+        for table in EXPORTABLE_TABLES
+    }
@@ -0,0 +1,213 @@
+"""
+Query planner statistics and plan regression checks
+SQLite only uses table statistics (sqlite_stat1) that ANALYZE has
+collected, so tables that grew by bulk loads are planned with stale or
+missing numbers. record_bulk_change() counts rows added per table (in
+analyze_state) and re-runs ANALYZE on a table once the rows changed since
+its last ANALYZE pass a threshold.
+
+check_query_plans() runs EXPLAIN QUERY PLAN for every analytic query in
+app/data/incidents.py, unscoped and with a row-level scope, stores a new
+plan_snapshots row whenever a plan differs from the last one stored, and
+warns when a table that used to be read with an index SEARCH is now
+SCANned. A query that cannot be planned at all (e.g. it names a column
+that does not exist) is reported as a regression and nothing is stored.
+"""
+
+import re
+import sqlite3
+from pathlib import Path
+
+from app.data.access import Principal, scoped_where
+from app.data.incidents import ANALYTIC_QUERIES
+
+# ANALYZE a table once this many rows changed since its last ANALYZE...
+ANALYZE_MIN_ROWS = 1000
+# ...or this fraction of its size at that time, whichever is larger
+ANALYZE_CHANGE_FRACTION = 0.1
+
+# Rows sampled per index by ANALYZE (0 = read everything)
+ANALYSIS_LIMIT = 1000
+
+# Scoped principal used to plan the row-filtered variants
+_PLAN_PRINCIPAL = Principal("plan-check", "user")
+
+_ACCESS = re.compile(r"^(SCAN|SEARCH) (?:TABLE )?(\w+)")
+
+
+def analyze_table(conn, table):
+    """
+    Refresh planner statistics for one table and reset its change count.
+
+    Returns:
+        int: Row count of the table
+    """
+    conn.commit()
+    conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+    conn.execute(f"ANALYZE {table}")
+    rows = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    conn.execute(
+        """
+        INSERT INTO analyze_state (table_name, rows_changed, analyzed_rows, analyzed_at)
+        VALUES (?, 0, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(table_name) DO UPDATE SET
+            rows_changed = 0,
+            analyzed_rows = excluded.analyzed_rows,
+            analyzed_at = excluded.analyzed_at
+        """,
+        (table, rows)
+    )
+    conn.commit()
+    print(f" Analyzed {table} ({rows} rows)")
+    return rows
+
+
+def record_bulk_change(conn, table, rows):
+    """
+    Count rows added to a table and ANALYZE it when past the threshold.
+
+    A table that was never analyzed is analyzed on its first bulk load.
+    After an ANALYZE the query plans are re-checked, since new statistics
+    are what changes them.
+
+    Args:
+        conn: Database connection
+        table: Table that was loaded
+        rows: Number of rows added or changed
+
+    Returns:
+        bool: True if the table was analyzed
+    """
+    if rows <= 0:
+        return False
+
+    conn.execute(
+        """
+        INSERT INTO analyze_state (table_name, rows_changed) VALUES (?, ?)
+        ON CONFLICT(table_name) DO UPDATE SET rows_changed = rows_changed + excluded.rows_changed
+        """,
+        (table, rows)
+    )
+    changed, analyzed_rows = conn.execute(
+        "SELECT rows_changed, analyzed_rows FROM analyze_state WHERE table_name = ?", (table,)
+    ).fetchone()
+    conn.commit()
+
+    if analyzed_rows is not None and changed < max(ANALYZE_MIN_ROWS, ANALYZE_CHANGE_FRACTION * analyzed_rows):
+        return False
+
+    analyze_table(conn, table)
+    check_query_plans(conn)
+    return True
+
+
+def explain(conn, query, params=()):
+    """Return the EXPLAIN QUERY PLAN detail lines of a query."""
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params)]
+
+
+def table_access(plan):
+    """
+    Map each table in a plan to 'SEARCH' or 'SCAN'.
+
+    Reading a whole covering index counts as a SCAN; a table that is
+    searched in one step and scanned in another counts as a SCAN.
+    """
+    access = {}
+    for line in plan:
+        match = _ACCESS.match(line)
+        if match:
+            kind, table = match.groups()
+            if access.get(table) != "SCAN":
+                access[table] = kind
+    return access
+
+
+def _planning_connection(conn):
+    """
+    Open a fresh read-only connection to conn's database file.
+
+    EXPLAIN statements do not check the schema version, so a statement
+    cached by a long-lived connection keeps returning its old plan after
+    an index is dropped or created. A new connection always plans against
+    the current schema and statistics. In-memory databases use conn itself.
+    """
+    path = next(row[2] for row in conn.execute("PRAGMA database_list") if row[1] == "main")
+    if not path:
+        return None
+    return sqlite3.connect(f"{Path(path).as_uri()}?mode=ro", uri=True)
+
+
+def analytic_plans(conn):
+    """
+    Plan every analytic query, unscoped and row-scoped.
+
+    Returns:
+        tuple: (plans, errors) where plans maps query name -> list of plan
+        lines and errors maps query name -> message for the queries that
+        could not be planned
+    """
+    planning = _planning_connection(conn)
+    try:
+        return _plan_queries(planning or conn)
+    finally:
+        if planning is not None:
+            planning.close()
+
+
+def _plan_queries(conn):
+    """Plan every analytic query variant on one connection."""
+    plans = {}
+    errors = {}
+    for name, (template, conditions, sample_params) in ANALYTIC_QUERIES.items():
+        for variant, principal in ((name, None), (f"{name}:scoped", _PLAN_PRINCIPAL)):
+            where, params = scoped_where(principal, "cyber_incidents", conditions)
+            try:
+                query = template.format(source="cyber_incidents", where=where)
+                plans[variant] = explain(conn, query, params + sample_params)
+            except sqlite3.Error as e:
+                errors[variant] = str(e)
+    return plans, errors
+
+
+def check_query_plans(conn):
+    """
+    Snapshot the analytic query plans and warn about SEARCH -> SCAN changes.
+
+    Queries that fail to plan are reported as regressions; their last
+    good snapshot is kept.
+
+    Returns:
+        list: Regression messages (empty if no plan got worse)
+    """
+    plans, errors = analytic_plans(conn)
+    regressions = [f"{name}: query cannot be planned ({error})" for name, error in errors.items()]
+    changed = 0
+
+    for name, plan in plans.items():
+        row = conn.execute(
+            "SELECT plan FROM plan_snapshots WHERE query_name = ? ORDER BY id DESC LIMIT 1", (name,)
+        ).fetchone()
+        previous = row[0].split("\n") if row else None
+        if previous == plan:
+            continue
+
+        changed += 1
+        conn.execute(
+            "INSERT INTO plan_snapshots (query_name, plan) VALUES (?, ?)", (name, "\n".join(plan))
+        )
+        if previous is None:
+            continue
+
+        before, after = table_access(previous), table_access(plan)
+        for table, kind in after.items():
+            if kind == "SCAN" and before.get(table) == "SEARCH":
+                regressions.append(f"{name}: {table} changed from index SEARCH to full SCAN")
+
+    conn.commit()
+
+    if changed:
+        print(f" Query plans: {changed} new or changed snapshot(s) stored")
+    for message in regressions:
+        print(f" WARNING: plan regression in {message}")
+    return regressions
@@ -1,3 +1,213 @@
+# Column dtypes used when reading tables back into pandas.
+# Columns not listed here are returned as plain Python objects.
+COLUMN_DTYPES = {
+    "cyber_incidents": {
+        "timestamp": "datetime64[ns]",
+        "severity": "category",
+        "category": "category",
+        "status": "category",
+        "inserted_at": "datetime64[ns]",
+    },
+    "it_tickets": {
+        "priority": "category",
+        "status": "category",
+        "assigned_to": "category",
+        "created_at": "datetime64[ns]",
+        "resolution_time_hours": "float64",
+        "inserted_at": "datetime64[ns]",
+    },
+}
+
+
+# ---------------------- TABLE DEFINITIONS ----------------------
+# Bump SCHEMA_VERSION whenever SCHEMA_STATEMENTS changes
+SCHEMA_VERSION = 9
+
+USERS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL UNIQUE,
+    password_hash TEXT NOT NULL,
+    role TEXT DEFAULT 'user',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+CYBER_INCIDENTS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS cyber_incidents (
+    incident_id TEXT UNIQUE,
+    timestamp TEXT,
+    severity TEXT,
+    category TEXT,
+    status TEXT,
+    description TEXT,
+    inserted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    reported_by TEXT
+)
+"""
+
+DATASETS_METADATA_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS datasets_metadata (
+    dataset_id TEXT UNIQUE,
+    name TEXT NOT NULL,
+    rows INTEGER,
+    columns INTEGER,
+    uploaded_by TEXT,
+    upload_date TEXT
+)
+"""
+
+IT_TICKETS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS it_tickets (
+    ticket_id TEXT UNIQUE NOT NULL,
+    priority TEXT,
+    description TEXT,
+    status TEXT,
+    assigned_to TEXT,
+    created_at TEXT,
+    resolution_time_hours REAL,
+    inserted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    version INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+DATASET_FILES_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS dataset_files (
+    dataset_id TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    fingerprint TEXT,
+    row_count INTEGER,
+    profiled_at TIMESTAMP
+)
+"""
+
+DATASET_COLUMN_STATS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS dataset_column_stats (
+    dataset_id TEXT NOT NULL,
+    column_name TEXT NOT NULL,
+    position INTEGER,
+    inferred_type TEXT,
+    null_count INTEGER,
+    distinct_estimate INTEGER,
+    min_value TEXT,
+    max_value TEXT,
+    histogram TEXT,
+    PRIMARY KEY (dataset_id, column_name)
+)
+"""
+
+CHANGE_LOG_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    op TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    payload TEXT,
+    row_key TEXT,
+    changed_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+)
+"""
+
+CDC_CHECKPOINTS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS cdc_checkpoints (
+    consumer TEXT PRIMARY KEY,
+    last_seq INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+INGEST_QUARANTINE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS ingest_quarantine (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    source_file TEXT,
+    row_number INTEGER,
+    reasons TEXT NOT NULL,
+    payload TEXT,
+    quarantined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+INCIDENT_TICKET_LINKS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS incident_ticket_links (
+    incident_id TEXT NOT NULL,
+    ticket_id TEXT NOT NULL,
+    lag_seconds INTEGER NOT NULL,
+    PRIMARY KEY (incident_id, ticket_id)
+) WITHOUT ROWID
+"""
+
+ANALYZE_STATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS analyze_state (
+    table_name TEXT PRIMARY KEY,
+    rows_changed INTEGER NOT NULL DEFAULT 0,
+    analyzed_rows INTEGER,
+    analyzed_at TIMESTAMP
+)
+"""
+
+PLAN_SNAPSHOTS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS plan_snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    query_name TEXT NOT NULL,
+    plan TEXT NOT NULL,
+    captured_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+# Ticket -> incident lookups; dropped and rebuilt by rebuild_correlations()
+INCIDENT_TICKET_LINKS_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_incident_ticket_links_ticket "
+    "ON incident_ticket_links (ticket_id, incident_id)"
+)
+
+# Every statement run by create_all_tables(), in order
+SCHEMA_STATEMENTS = [
+    USERS_TABLE_SQL,
+    CYBER_INCIDENTS_TABLE_SQL,
+    DATASETS_METADATA_TABLE_SQL,
+    IT_TICKETS_TABLE_SQL,
+    DATASET_FILES_TABLE_SQL,
+    DATASET_COLUMN_STATS_TABLE_SQL,
+    CHANGE_LOG_TABLE_SQL,
+    CDC_CHECKPOINTS_TABLE_SQL,
+    INGEST_QUARANTINE_TABLE_SQL,
+    INCIDENT_TICKET_LINKS_TABLE_SQL,
+    ANALYZE_STATE_TABLE_SQL,
+    PLAN_SNAPSHOTS_TABLE_SQL,
+]
+
+# Columns added after a table was first released: (table, column, type).
+# Added with ALTER TABLE to databases created before they existed.
+SCHEMA_COLUMNS = [
+    ("cyber_incidents", "reported_by", "TEXT"),
+    # Bumped by every ticket update (see patch_tickets() in app/data/tickets.py)
+    ("it_tickets", "version", "INTEGER NOT NULL DEFAULT 0"),
+    # Natural key of the changed row (see install_change_triggers())
+    ("change_log", "row_key", "TEXT"),
+]
+
+# Indexes backing the row-level access filters (see app/data/access.py)
+# and the incident/ticket correlation
+SCHEMA_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_cyber_incidents_reported_by ON cyber_incidents (reported_by)",
+    "CREATE INDEX IF NOT EXISTS idx_it_tickets_assigned_to ON it_tickets (assigned_to)",
+    # Covering time-window join keys (see app/data/correlation.py)
+    "CREATE INDEX IF NOT EXISTS idx_cyber_incidents_timestamp ON cyber_incidents (timestamp, incident_id)",
+    "CREATE INDEX IF NOT EXISTS idx_it_tickets_created_at ON it_tickets (created_at, ticket_id)",
+    INCIDENT_TICKET_LINKS_INDEX_SQL,
+    # Latest plan of each query (see app/data/planner.py)
+    "CREATE INDEX IF NOT EXISTS idx_plan_snapshots_query ON plan_snapshots (query_name, id)",
+]
+
+# Tables whose inserts/updates/deletes are recorded in change_log, with
+# the natural key column logged as change_log.row_key
+CDC_TABLES = {
+    "cyber_incidents": "incident_id",
+    "it_tickets": "ticket_id",
+}
+
+
 def create_users_table(conn):
     """
     Create the users table if it doesn't exist.
@@ -9,19 +219,7 @@ def create_users_table(conn):
         conn: Database connection object
     """
     cursor = conn.cursor()
-    
-    # SQL statement to create users table
-    create_table_sql = """
-    CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT NOT NULL UNIQUE,
-        password_hash TEXT NOT NULL,
-        role TEXT DEFAULT 'user',
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    """
-    
-    cursor.execute(create_table_sql)
+    cursor.execute(USERS_TABLE_SQL)
     conn.commit()
     print(" Users table created successfully!")
 
@@ -30,20 +228,7 @@ def create_cyber_incidents_table(conn):
     Create the cyber_incidents table.
     """
     cursor = conn.cursor()
-
-    create_table_sql = """
-    CREATE TABLE IF NOT EXISTS cyber_incidents (
-        incident_id TEXT UNIQUE,
-        timestamp TEXT,
-        severity TEXT,
-        category TEXT,
-        status TEXT,
-        description TEXT,
-        inserted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    """
-
-    cursor.execute(create_table_sql)
+    cursor.execute(CYBER_INCIDENTS_TABLE_SQL)
     conn.commit()
     print(" Cyber Incidents table created successfully!")
 
@@ -53,19 +238,7 @@ def create_datasets_metadata_table(conn):
     Create the datasets_metadata table.
     """
     cursor = conn.cursor()
-
-    create_table_sql = """
-    CREATE TABLE IF NOT EXISTS datasets_metadata (
-        dataset_id TEXT UNIQUE,
-        name TEXT NOT NULL,
-        rows INTEGER,
-        columns INTEGER,
-        uploaded_by TEXT,
-        upload_date TEXT
-    )
-    """
-
-    cursor.execute(create_table_sql)
+    cursor.execute(DATASETS_METADATA_TABLE_SQL)
     conn.commit()
     print(" Datasets Metadata table created successfully!")
 
@@ -76,28 +249,97 @@ def create_it_tickets_table(conn):
     Create the it_tickets table.
     """
     cursor = conn.cursor()
+    cursor.execute(IT_TICKETS_TABLE_SQL)
+    conn.commit()
+    print(" IT Tickets table created successfully!")
+
+
+def _change_log_insert(table, key, columns, op, image):
+    """Build the trigger statement logging one row image to change_log."""
+    payload = ", ".join(f"'{c}', {image}.{c}" for c in columns)
+    return (f"INSERT INTO change_log (table_name, op, row_id, row_key, payload) "
+            f"SELECT '{table}', '{op}', {image}.rowid, {image}.{key}, json_object({payload})")
+
 
-    create_table_sql = """
-    CREATE TABLE IF NOT EXISTS it_tickets (
-        ticket_id TEXT UNIQUE NOT NULL,
-        priority TEXT,
-        description TEXT,
-        status TEXT,
-        assigned_to TEXT,
-        created_at TEXT,
-        resolution_time_hours REAL,
-        inserted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
+def install_change_triggers(conn, table, schema=None):
     """
+    (Re)create the change-data-capture triggers of a table.
 
-    cursor.execute(create_table_sql)
-    conn.commit()
-    print(" IT Tickets table created successfully!")
+    With schema set, the triggers are created as TEMP triggers on that
+    attached database's copy of the table (see the partitioning helpers
+    in app/data/db.py); they log into main.change_log under the same
+    table name.
+
+    Each insert/update/delete appends one change_log row holding the new
+    row image (the old one for deletes) as JSON, keyed by the table's
+    natural key in row_key. SQLite reuses the rowid of a deleted row (and
+    VACUUM may renumber rowids), so row_id alone cannot identify a row
+    across changes. An update that changes the key first logs a delete of
+    the old key. The column list is read from the live table, so
+    re-running this after adding a column keeps the payload complete.
+    """
+    key = CDC_TABLES[table]
+    if schema is None:
+        target, prefix, create, drop = table, f"trg_{table}", "CREATE TRIGGER", ""
+    else:
+        target, prefix, create, drop = f'"{schema}".{table}', f"trg_{schema}_{table}", "CREATE TEMP TRIGGER", "temp."
+    columns = [row[1] for row in conn.execute(f'PRAGMA "{schema or "main"}".table_info({table})')]
+
+    for op, event, image in (("I", "INSERT", "NEW"), ("U", "UPDATE", "NEW"), ("D", "DELETE", "OLD")):
+        body = _change_log_insert(table, key, columns, op, image) + ";"
+        if op == "U":
+            body = (_change_log_insert(table, key, columns, "D", "OLD")
+                    + f" WHERE OLD.{key} IS NOT NEW.{key};\n            " + body)
+        conn.execute(f"DROP TRIGGER IF EXISTS {drop}{prefix}_cdc_{op.lower()}")
+        conn.execute(f"""
+        {create} {prefix}_cdc_{op.lower()}
+        AFTER {event} ON {target}
+        BEGIN
+            {body}
+        END
+        """)
 
 
 def create_all_tables(conn):
-    """Create all tables."""
-    create_users_table(conn)
-    create_cyber_incidents_table(conn)
-    create_datasets_metadata_table(conn)
-    create_it_tickets_table(conn)
\ No newline at end of file
+    """
+    Create all tables in a single transaction.
+
+    The schema version is stored in PRAGMA user_version; when it already
+    matches SCHEMA_VERSION the bootstrap is skipped entirely.
+
+    Returns:
+        bool: True if the schema was (re)applied, False if it was current
+    """
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    if current == SCHEMA_VERSION:
+        return False
+
+    # Every step is idempotent, so re-running them on an older schema only
+    # adds what is missing
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    try:
+        for statement in SCHEMA_STATEMENTS:
+            conn.execute(statement)
+        for table, column, column_type in SCHEMA_COLUMNS:
+            existing = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+            if column not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+        for statement in SCHEMA_INDEXES:
+            conn.execute(statement)
+        for table, key in CDC_TABLES.items():
+            install_change_triggers(conn, table)
+            # Key changes logged before row_key existed
+            conn.execute(
+                f"UPDATE change_log SET row_key = json_extract(payload, '$.{key}') "
+                f"WHERE table_name = ? AND row_key IS NULL",
+                (table,)
+            )
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    print(f" Schema created (version {SCHEMA_VERSION})")
+    return True
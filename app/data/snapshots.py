@@ -0,0 +1,223 @@
+"""
+Read-only database snapshots for analytics
+Heavy pandas analytics can run against a point-in-time copy of the
+database instead of the live file used by CRUD writes.
+
+create_snapshot() copies the live database with SQLite's online backup
+API (a consistent copy even while writers are active) into a temporary
+file that is renamed into place when complete. Rows stored in per-year
+partition files (see enable_partitioning() in db.py) are merged into the
+snapshot's own tables, so analytics on a snapshot see every row without
+attaching anything. Each file is copied consistently on its own; a write
+landing in a partition while the snapshot is taken may or may not be
+included. Snapshots are opened with
+mode=ro&immutable=1, so SQLite skips all locking and change detection on
+them. run_parallel_analytics() fans independent analytic queries out to
+worker processes that each open the same snapshot.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from app.data.db import DB_PATH, PARTITION_DIR, PARTITIONED_TABLES, list_partitions
+
+SNAPSHOT_DIR = Path("DATA") / "snapshots"
+
+# Number of snapshots kept on disk; older ones are deleted
+KEEP_SNAPSHOTS = 3
+
+# Pages copied per backup step (the source is unlocked between steps)
+BACKUP_PAGES_PER_STEP = 1024
+
+# Analytic functions (in app.data.incidents) that may run on snapshots
+ANALYTIC_FUNCTIONS = (
+    "get_all_incidents",
+    "get_incidents_by_type_count",
+    "get_high_severity_by_status",
+    "get_incident_types_with_many_cases",
+)
+
+_NAME_FORMAT = "snapshot_%Y%m%dT%H%M%S%f.db"
+
+
+def list_snapshots(snapshot_dir=SNAPSHOT_DIR):
+    """Return snapshot paths, oldest first."""
+    if not snapshot_dir.exists():
+        return []
+    return sorted(snapshot_dir.glob("snapshot_*.db"))
+
+
+def latest_snapshot(snapshot_dir=SNAPSHOT_DIR):
+    """Return the newest snapshot path, or None."""
+    snapshots = list_snapshots(snapshot_dir)
+    return snapshots[-1] if snapshots else None
+
+
+def snapshot_age(snapshot_path):
+    """Return how many seconds ago a snapshot was taken."""
+    taken = datetime.strptime(Path(snapshot_path).name, _NAME_FORMAT)
+    return (datetime.now() - taken).total_seconds()
+
+
+def _merge_partitions(copy, partition_dir):
+    """
+    Append the rows of every partition file to the snapshot's main tables.
+
+    Returns:
+        int: Number of rows merged
+    """
+    partitions = list_partitions(partition_dir)
+    if not partitions:
+        return 0
+
+    # Nothing writes to a snapshot, so its change-log triggers would only
+    # record the merge itself
+    for (name,) in copy.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall():
+        copy.execute(f'DROP TRIGGER "{name}"')
+
+    merged = 0
+    for partition in partitions:
+        copy.execute(f'ATTACH DATABASE ? AS "{partition}"', (str(partition_dir / f"{partition}.db"),))
+        for table in PARTITIONED_TABLES:
+            main_columns = {row[1] for row in copy.execute(f"PRAGMA main.table_info({table})")}
+            columns = ", ".join(
+                row[1] for row in copy.execute(f'PRAGMA "{partition}".table_info({table})')
+                if row[1] in main_columns
+            )
+            if columns:
+                merged += copy.execute(
+                    f'INSERT INTO main.{table} ({columns}) SELECT {columns} FROM "{partition}".{table}'
+                ).rowcount
+        copy.commit()
+        copy.execute(f'DETACH DATABASE "{partition}"')
+    return merged
+
+
+def create_snapshot(db_path=DB_PATH, snapshot_dir=SNAPSHOT_DIR, keep=KEEP_SNAPSHOTS,
+                    partition_dir=PARTITION_DIR):
+    """
+    Take a consistent copy of the database with the online backup API.
+
+    Args:
+        db_path: Live database file
+        snapshot_dir: Folder for snapshot files
+        keep: Number of snapshots to keep (older ones are removed)
+        partition_dir: Folder of partition files whose rows are merged
+            into the snapshot (skipped when it holds none)
+
+    Returns:
+        Path: The new snapshot file
+    """
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    target = snapshot_dir / datetime.now().strftime(_NAME_FORMAT)
+    partial = target.with_suffix(".part")
+
+    source = sqlite3.connect(str(db_path))
+    copy = sqlite3.connect(str(partial))
+    try:
+        source.backup(copy, pages=BACKUP_PAGES_PER_STEP)
+        _merge_partitions(copy, Path(partition_dir))
+    finally:
+        copy.close()
+        source.close()
+
+    # Readers only ever see complete snapshots
+    os.replace(partial, target)
+    print(f" Snapshot created: {target}")
+
+    for old in list_snapshots(snapshot_dir)[:-keep] if keep else []:
+        old.unlink()
+
+    return target
+
+
+def open_snapshot(snapshot_path=None, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Open a snapshot read-only (the newest one by default).
+
+    Returns:
+        sqlite3.Connection: Read-only, immutable connection
+    """
+    snapshot_path = snapshot_path or latest_snapshot(snapshot_dir)
+    if snapshot_path is None:
+        raise FileNotFoundError(f"No snapshots in {snapshot_dir}")
+
+    uri = f"{Path(snapshot_path).resolve().as_uri()}?mode=ro&immutable=1"
+    return sqlite3.connect(uri, uri=True)
+
+
+def start_snapshot_scheduler(interval, db_path=DB_PATH, snapshot_dir=SNAPSHOT_DIR,
+                             partition_dir=PARTITION_DIR):
+    """
+    Take a snapshot every `interval` seconds in a background thread.
+
+    Returns:
+        threading.Event: Set it to stop the scheduler
+    """
+    stop_event = threading.Event()
+
+    def run():
+        while not stop_event.is_set():
+            try:
+                create_snapshot(db_path, snapshot_dir, partition_dir=partition_dir)
+            except sqlite3.Error as e:
+                print(f" Snapshot failed: {e}")
+            stop_event.wait(interval)
+
+    threading.Thread(target=run, name="snapshot-scheduler", daemon=True).start()
+    return stop_event
+
+
+def _run_analytic(snapshot_path, function_name, kwargs):
+    """Worker: run one analytic function against a snapshot."""
+    from app.data import incidents
+
+    conn = open_snapshot(snapshot_path)
+    try:
+        return getattr(incidents, function_name)(conn, **kwargs)
+    finally:
+        conn.close()
+
+
+def run_parallel_analytics(jobs, snapshot_path=None, snapshot_dir=SNAPSHOT_DIR, max_workers=None):
+    """
+    Run independent analytic queries in parallel on one snapshot.
+
+    Args:
+        jobs: dict of label -> (function name, kwargs), function names
+            from ANALYTIC_FUNCTIONS
+        snapshot_path: Snapshot to query (default: newest)
+        snapshot_dir: Folder holding snapshots
+        max_workers: Worker processes (default: one per job, up to CPUs)
+
+    Returns:
+        tuple: (dict of label -> DataFrame, snapshot age in seconds)
+    """
+    for function_name, _ in jobs.values():
+        if function_name not in ANALYTIC_FUNCTIONS:
+            raise ValueError(f"'{function_name}' is not an analytic function")
+
+    snapshot_path = snapshot_path or latest_snapshot(snapshot_dir)
+    if snapshot_path is None:
+        raise FileNotFoundError(f"No snapshots in {snapshot_dir}")
+
+    age = snapshot_age(snapshot_path)
+    print(f" Running {len(jobs)} analytic queries on {Path(snapshot_path).name} "
+          f"(age {age:.0f}s)")
+
+    workers = max_workers or min(len(jobs), os.cpu_count() or 1)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            label: pool.submit(_run_analytic, str(snapshot_path), name, kwargs)
+            for label, (name, kwargs) in jobs.items()
+        }
+        results = {label: future.result() for label, future in futures.items()}
+    print(f" Analytics finished in {time.perf_counter() - start:.2f}s")
+
+    return results, age
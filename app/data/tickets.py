@@ -1,94 +1,296 @@
 """
 Ticket CRUD operations
-This module provides create, read, update, delete functions for the 'tickets' table.
-Assumes the following schema exists:
-
-CREATE TABLE IF NOT EXISTS tickets (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    title TEXT NOT NULL,
-    description TEXT,
-    status TEXT DEFAULT 'open',
-    priority TEXT DEFAULT 'medium',
-    created_at TEXT DEFAULT CURRENT_TIMESTAMP
-);
+This module provides create, read, update, delete functions for the
+'it_tickets' table (IT_TICKETS_TABLE_SQL in app/data/schema.py), keyed
+by ticket_id. Every function takes an optional open connection and opens
+(and closes) its own when none is given.
+
+The version column is bumped by every update, which lets patch_tickets()
+detect concurrent changes.
+
+With partitioning enabled on the connection (see enable_partitioning() in
+app/data/db.py) new tickets go to the partition of their year, reads use
+the it_tickets_all view and updates/deletes reach every partition.
 """
 
 import sqlite3
-from app.data.db import connect_database
-
-
-def create_ticket(title, description, status="open", priority="medium"):
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        INSERT INTO tickets (title, description, status, priority)
-        VALUES (?, ?, ?, ?)
-        """,
-        (title, description, status, priority)
-    )
-    conn.commit()
-    ticket_id = cursor.lastrowid
-    conn.close()
-    return ticket_id
+from datetime import datetime
+from functools import lru_cache
+
+from app.data.cache import bump_table_generation
+from app.data.db import (
+    connect_database, insert_partitioned, next_numeric_id, partition_schemas, partitioned_source,
+    partitioning_enabled,
+)
+from app.data.access import require_permission, scoped_where
+from app.data.schema import COLUMN_DTYPES
+
+INSERT_IT_TICKET_SQL = """
+INSERT INTO it_tickets
+(ticket_id, priority, description, status, assigned_to, created_at, resolution_time_hours)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# it_tickets columns that update_ticket() / patch_tickets() may change
+UPDATABLE_FIELDS = ("description", "status", "priority", "assigned_to")
+
+# Max ids per "WHERE ticket_id IN (...)" lookup (below SQLite's variable limit)
+_LOOKUP_CHUNK = 500
+
+
+def create_ticket(description, priority="Medium", status="Open", assigned_to=None,
+                  ticket_id=None, created_at=None, conn=None):
+    """
+    Insert a new IT ticket.
+
+    Args:
+        description: Problem description
+        priority: Ticket priority
+        status: Ticket status
+        assigned_to: Optional assignee
+        ticket_id: Optional ticket id (must be unique); defaults to one
+            more than the highest numeric ticket_id
+        created_at: Creation time; defaults to now
+        conn: Optional open connection
 
+    Returns:
+        str: ticket_id of the new ticket
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_database()
+    try:
+        if ticket_id is None:
+            ticket_id = next_numeric_id(conn, partitioned_source(conn, "it_tickets"), "ticket_id")
+        if created_at is None:
+            created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        params = (str(ticket_id), priority, description, status, assigned_to, created_at, None)
 
-def get_all_tickets():
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM tickets")
-    rows = cursor.fetchall()
-    conn.close()
+        if partitioning_enabled(conn, "it_tickets"):
+            columns = ("ticket_id", "priority", "description", "status", "assigned_to", "created_at",
+                       "resolution_time_hours")
+            insert_partitioned(conn, "it_tickets", dict(zip(columns, params)))
+        else:
+            conn.execute(INSERT_IT_TICKET_SQL, params)
+            conn.commit()
+    finally:
+        if own_conn:
+            conn.close()
+
+    bump_table_generation("it_tickets")
+    return str(ticket_id)
+
+
+def get_all_tickets(conn=None):
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_database()
+    rows = conn.execute(f"SELECT * FROM {partitioned_source(conn, 'it_tickets')}").fetchall()
+    if own_conn:
+        conn.close()
     return rows
 
 
-def get_ticket_by_id(ticket_id):
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM tickets WHERE id = ?", (ticket_id,))
-    row = cursor.fetchone()
-    conn.close()
+def get_it_tickets(conn, principal=None, typed=False):
+    """
+    Retrieve IT support tickets (the it_tickets table loaded from CSV).
+
+    Roles with a row scope only see tickets assigned to them. With
+    typed=True the block-wise read path is used and columns are typed as
+    in COLUMN_DTYPES["it_tickets"] (less memory, slower; see
+    get_all_incidents()).
+
+    Returns:
+        pandas.DataFrame: Tickets
+    """
+    import pandas as pd
+    from app.data.fastread import read_sql_fast
+
+    require_permission(principal, "tickets:read")
+    where, params = scoped_where(principal, "it_tickets")
+
+    query = f"SELECT * FROM {partitioned_source(conn, 'it_tickets')}" + where
+    if typed:
+        return read_sql_fast(conn, query, params, dtypes=COLUMN_DTYPES["it_tickets"])
+    return pd.read_sql_query(query, conn, params=params)
+
+
+def get_ticket_by_id(ticket_id, conn=None):
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_database()
+    row = conn.execute(
+        f"SELECT * FROM {partitioned_source(conn, 'it_tickets')} WHERE ticket_id = ?", (str(ticket_id),)
+    ).fetchone()
+    if own_conn:
+        conn.close()
     return row
 
 
-def update_ticket(ticket_id, title=None, description=None, status=None, priority=None):
-    conn = connect_database()
-    cursor = conn.cursor()
+@lru_cache(maxsize=None)
+def _update_sql(fields, check_version, schema="main"):
+    """
+    Build (once per field signature and schema) the UPDATE statement for a
+    set of fields.
 
-    # Build dynamic updates
-    fields = []
-    values = []
+    Reusing the exact same SQL text also lets sqlite3's statement cache
+    skip re-preparing it.
+    """
+    assignments = ", ".join(f"{field} = ?" for field in fields)
+    query = f"UPDATE {schema}.it_tickets SET {assignments}, version = version + 1 WHERE ticket_id = ?"
+    if check_version:
+        query += " AND version = ?"
+    return query
 
-    if title is not None:
-        fields.append("title = ?")
-        values.append(title)
-    if description is not None:
-        fields.append("description = ?")
-        values.append(description)
-    if status is not None:
-        fields.append("status = ?")
-        values.append(status)
-    if priority is not None:
-        fields.append("priority = ?")
-        values.append(priority)
+
+def update_ticket(ticket_id, description=None, status=None, priority=None, assigned_to=None, conn=None):
+    # Only the fields that were passed are updated
+    values = dict(description=description, status=status, priority=priority, assigned_to=assigned_to)
+    fields = tuple(name for name in UPDATABLE_FIELDS if values[name] is not None)
 
     # Nothing to update
     if not fields:
-        conn.close()
         return False
 
-    values.append(ticket_id)
-    query = f"UPDATE tickets SET {', '.join(fields)} WHERE id = ?"
-    cursor.execute(query, tuple(values))
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_database()
+    updated = 0
+    for schema in partition_schemas(conn, "it_tickets"):
+        cursor = conn.execute(
+            _update_sql(fields, False, schema),
+            tuple(values[name] for name in fields) + (str(ticket_id),)
+        )
+        updated += cursor.rowcount
     conn.commit()
-    conn.close()
-    return True
+    if own_conn:
+        conn.close()
+    bump_table_generation("it_tickets")
+    return updated > 0
+
+
+def _current_versions(conn, ticket_ids):
+    """
+    Return {ticket_id: (schema, version)} for the given ticket ids that
+    exist; schema is the database holding the row (see partition_schemas()).
+    """
+    ids = list(ticket_ids)
+    versions = {}
+    for schema in partition_schemas(conn, "it_tickets"):
+        for start in range(0, len(ids), _LOOKUP_CHUNK):
+            chunk = ids[start:start + _LOOKUP_CHUNK]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = conn.execute(
+                f"SELECT ticket_id, version FROM {schema}.it_tickets WHERE ticket_id IN ({placeholders})",
+                chunk
+            )
+            versions.update((ticket_id, (schema, version)) for ticket_id, version in rows)
+    return versions
+
+
+def patch_tickets(patches, conn=None):
+    """
+    Apply many field patches to it_tickets in one transaction.
+
+    Patches with the same set of fields are grouped and run with a single
+    executemany() against a cached UPDATE statement. Every row is checked
+    against its expected version (optimistic concurrency): pass
+    (ticket_id, fields, expected_version) to assert the version you read,
+    or (ticket_id, fields) to patch whatever version is current.
+
+    Args:
+        patches: Iterable of (ticket_id, {field: value}) or
+            (ticket_id, {field: value}, expected_version)
+        conn: Optional open connection (a new one is opened and closed
+            if not given)
+
+    Returns:
+        list: (ticket_id, outcome, version) per patch, in input order.
+        outcome is 'updated', 'conflict', 'not_found' or 'unchanged'
+        (empty patch); version is the ticket's version afterwards.
+    """
+    # ticket_id is TEXT; normalise so 42 and "42" are the same ticket
+    patches = [(str(p[0]),) + tuple(p[1:]) for p in patches]
+    for patch in patches:
+        unknown = set(patch[1]) - set(UPDATABLE_FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot patch ticket field(s): {', '.join(sorted(unknown))}")
+
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_database()
 
+    try:
+        if conn.in_transaction:
+            conn.commit()
 
-def delete_ticket(ticket_id):
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM tickets WHERE id = ?", (ticket_id,))
+        # Hold the write lock while reading versions so nobody can change
+        # them between the check and the update
+        conn.execute("BEGIN IMMEDIATE")
+        locations = _current_versions(conn, {patch[0] for patch in patches})
+        versions = {ticket_id: version for ticket_id, (_, version) in locations.items()}
+
+        outcomes = []
+        groups = {}
+        seen = {}
+        for patch in patches:
+            ticket_id, fields = patch[0], patch[1]
+            expected = patch[2] if len(patch) > 2 else None
+            current = versions.get(ticket_id)
+
+            if current is None:
+                outcomes.append((ticket_id, "not_found", None))
+                continue
+            if expected is not None and expected != current:
+                outcomes.append((ticket_id, "conflict", current))
+                continue
+            if not fields:
+                outcomes.append((ticket_id, "unchanged", current))
+                continue
+
+            # A ticket patched twice must see its first update applied
+            # before the second, so repeated ids go into later rounds
+            round_number = seen.get(ticket_id, 0)
+            seen[ticket_id] = round_number + 1
+
+            schema = locations[ticket_id][0]
+            signature = tuple(name for name in UPDATABLE_FIELDS if name in fields)
+            params = tuple(fields[name] for name in signature) + (ticket_id, current)
+            groups.setdefault((round_number, schema, signature), []).append(params)
+
+            versions[ticket_id] = current + 1
+            outcomes.append((ticket_id, "updated", current + 1))
+
+        for (_, schema, signature), rows in sorted(groups.items()):
+            cursor = conn.executemany(_update_sql(signature, True, schema), rows)
+            if cursor.rowcount != len(rows):
+                raise sqlite3.DatabaseError(
+                    f"Ticket patch matched {cursor.rowcount} of {len(rows)} rows"
+                )
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if own_conn:
+            conn.close()
+
+    if groups:
+        bump_table_generation("it_tickets")
+    return outcomes
+
+
+def delete_ticket(ticket_id, conn=None):
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_database()
+    deleted = 0
+    for schema in partition_schemas(conn, "it_tickets"):
+        cursor = conn.execute(f"DELETE FROM {schema}.it_tickets WHERE ticket_id = ?", (str(ticket_id),))
+        deleted += cursor.rowcount
     conn.commit()
-    conn.close()
-    return True
\ No newline at end of file
+    if own_conn:
+        conn.close()
+    bump_table_generation("it_tickets")
+    return deleted > 0
\ No newline at end of file
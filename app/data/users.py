@@ -1,4 +1,3 @@
-import bcrypt
 from app.data.db import connect_database
 
 def get_user_by_username(username):
@@ -48,6 +47,7 @@ def register_user(username, password, role="user"):
         return False, f"Username '{username}' already exists."
     
     # Hash the password
+    import bcrypt
     password_bytes = password.encode('utf-8')
     salt = bcrypt.gensalt()
     hashed = bcrypt.hashpw(password_bytes, salt)
@@ -88,6 +88,7 @@ def login_user(username, password):
         return False, "Username not found."
     
     # Verify password (user[2] is password_hash column)
+    import bcrypt
     stored_hash = user[2]
     password_bytes = password.encode('utf-8')
     hash_bytes = stored_hash.encode('utf-8')
@@ -0,0 +1,181 @@
+"""
+Data quality checks for the CSV pipeline
+Each table has a small rule set (required columns, allowed values, date
+columns, numeric ranges and a unique key). validate_chunk() applies every
+rule to a whole DataFrame chunk at once with vectorized pandas
+operations and splits it into rows to load and rows to quarantine, each
+quarantined row carrying the list of reasons it failed.
+"""
+
+import json
+
+from app.data.db import partitioned_source
+
+# Rules per table. Tables without rules are loaded unchecked.
+TABLE_RULES = {
+    "cyber_incidents": {
+        "key": "incident_id",
+        "required": ["incident_id", "timestamp", "severity", "status"],
+        "enums": {
+            "severity": {"Low", "Medium", "High", "Critical"},
+            "status": {"Open", "In Progress", "Resolved", "Closed"},
+        },
+        "dates": ["timestamp"],
+        "ranges": {},
+    },
+    "it_tickets": {
+        "key": "ticket_id",
+        "required": ["ticket_id", "priority", "status", "created_at"],
+        "enums": {
+            "priority": {"Low", "Medium", "High", "Critical"},
+            "status": {"Open", "In Progress", "Resolved", "Waiting for User", "Closed"},
+        },
+        "dates": ["created_at"],
+        "ranges": {"resolution_time_hours": (0, None)},
+    },
+    "datasets_metadata": {
+        "key": "dataset_id",
+        "required": ["dataset_id", "name"],
+        "enums": {},
+        "dates": ["upload_date"],
+        "ranges": {"rows": (0, None), "columns": (0, None)},
+    },
+}
+
+
+def key_strings(series):
+    """Normalise key values to the text SQLite stores (1000.0 -> '1000')."""
+    import pandas as pd
+
+    numeric = pd.to_numeric(series, errors="coerce")
+    if series.notna().sum() and numeric.notna().equals(series.notna()) \
+            and (numeric.dropna() % 1 == 0).all():
+        return numeric.astype("Int64").astype(str).where(series.notna())
+    return series.astype(str).where(series.notna())
+
+
+def load_existing_keys(conn, table):
+    """
+    Return the set of key values already stored in a table (in any
+    attached partition when partitioning is enabled).
+    """
+    rules = TABLE_RULES.get(table)
+    if rules is None:
+        return set()
+    try:
+        rows = conn.execute(f"SELECT {rules['key']} FROM {partitioned_source(conn, table)}").fetchall()
+    except Exception:
+        return set()
+    return {str(row[0]) for row in rows if row[0] is not None}
+
+
+def validate_chunk(df, table, seen_keys):
+    """
+    Split a chunk into valid rows and rejected rows.
+
+    Args:
+        df: Chunk read from the CSV
+        table: Target table name
+        seen_keys: Set of keys already loaded from this file; rows
+            repeating one of them (or an earlier valid row of the chunk)
+            are rejected as duplicates. Not modified: the caller adds
+            keys once their rows are actually inserted
+
+    Returns:
+        tuple: (valid DataFrame, rejected DataFrame with a 'reasons' column)
+    """
+    import pandas as pd
+
+    rules = TABLE_RULES.get(table)
+    if rules is None:
+        return df, df.iloc[0:0].assign(reasons=pd.Series(dtype=object))
+
+    reasons = pd.Series("", index=df.index, dtype=object)
+
+    def flag(mask, message):
+        nonlocal reasons
+        reasons = reasons.mask(mask, reasons + message + "; ")
+
+    for column in rules["required"]:
+        if column not in df.columns:
+            flag(pd.Series(True, index=df.index), f"missing column {column}")
+        else:
+            flag(df[column].isna(), f"{column} is empty")
+
+    for column, allowed in rules["enums"].items():
+        if column in df.columns:
+            values = df[column]
+            flag(values.notna() & ~values.isin(allowed), f"unknown {column}")
+
+    for column in rules["dates"]:
+        if column in df.columns:
+            values = df[column]
+            parsed = pd.to_datetime(values, errors="coerce", format="ISO8601")
+            flag(values.notna() & parsed.isna(), f"bad date in {column}")
+
+    for column, (low, high) in rules["ranges"].items():
+        if column in df.columns:
+            values = df[column]
+            numbers = pd.to_numeric(values, errors="coerce")
+            flag(values.notna() & numbers.isna(), f"{column} is not a number")
+            if low is not None:
+                flag(numbers < low, f"{column} below {low}")
+            if high is not None:
+                flag(numbers > high, f"{column} above {high}")
+
+    key = rules["key"]
+    if key in df.columns:
+        # Only rows that pass every other check can claim a key, so an
+        # invalid first copy does not make a later valid one a duplicate
+        keys = key_strings(df[key])
+        candidate = keys.notna() & (reasons == "")
+        duplicate = candidate & (keys.isin(seen_keys) | keys.where(candidate).duplicated(keep="first"))
+        flag(duplicate, f"duplicate {key}")
+
+    bad = reasons != ""
+    valid = df[~bad]
+    rejected = df[bad].assign(reasons=reasons[bad].str.rstrip("; "))
+
+    if key in df.columns:
+        # Store keys in canonical text form so later duplicate checks match
+        valid = valid.assign(**{key: keys[~bad]})
+
+    return valid, rejected
+
+
+def quarantine_rows(conn, table, source_file, rejected):
+    """
+    Store rejected rows with their reasons in ingest_quarantine.
+
+    Args:
+        conn: Database connection
+        table: Target table the rows were meant for
+        source_file: CSV file name
+        rejected: DataFrame from validate_chunk(), indexed by data row
+            position in the file (as pd.read_csv chunks are)
+
+    Returns:
+        int: Number of rows quarantined
+    """
+    if rejected.empty:
+        return 0
+
+    payload_columns = [c for c in rejected.columns if c != "reasons"]
+    records = rejected[payload_columns].astype(object).where(rejected[payload_columns].notna(), None)
+
+    conn.executemany(
+        """
+        INSERT INTO ingest_quarantine (table_name, source_file, row_number, reasons, payload)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        [
+            # +2: one for the header line, one for 1-based line numbers
+            (table, source_file, int(position) + 2, reasons,
+             json.dumps(dict(zip(payload_columns, values)), default=str))
+            for position, reasons, values in zip(
+                rejected.index, rejected["reasons"], records.itertuples(index=False, name=None)
+            )
+        ]
+    )
+    conn.commit()
+    return len(rejected)
@@ -0,0 +1,358 @@
+"""
+Single-writer ingest service
+Producers enqueue INSERT/UPDATE statements instead of writing to SQLite
+themselves. One background thread owns the only write connection and
+drains the queue in group commits: a batch is committed when it reaches
+max_batch statements or when max_delay seconds have passed since its first
+statement, so many writers share one lock acquisition and one fsync.
+
+Every submit() returns a concurrent.futures.Future that resolves to the
+statement's lastrowid (or raises its sqlite3 error).
+
+With spool_path set, each statement is also appended to a local JSONL
+spool before it is queued. The sequence number of the last committed spool
+record is stored in the database in the same transaction as the batch, so
+after a crash start() replays exactly the records that never committed.
+The spool is flushed to the OS but not fsynced: it covers a crash of this
+process, not power loss or an OS crash. Writes are only durable against
+those once their future has resolved (the batch commit is fsynced by
+SQLite).
+
+With partition_dir set, the writer connection enables partitioning (see
+app/data/db.py) and submit_incident() / submit_ticket() rows are written
+to the partition of their year; partitions a batch needs are attached
+before its transaction starts.
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+
+from app.data.db import (
+    DB_PATH, connect_database, enable_partitioning, partition_insert_sql, partition_schema,
+)
+from app.data.cache import bump_table_generation
+from app.data.incidents import INSERT_CYBER_INCIDENT_SQL
+from app.data.tickets import INSERT_IT_TICKET_SQL
+
+# Group commit thresholds
+DEFAULT_MAX_BATCH = 500
+DEFAULT_MAX_DELAY = 0.01  # seconds
+
+_STOP = object()
+
+
+class IngestService:
+    """Queue-backed writer that commits producer writes in groups."""
+
+    def __init__(self, db_path=DB_PATH, spool_path=None,
+                 max_batch=DEFAULT_MAX_BATCH, max_delay=DEFAULT_MAX_DELAY, partition_dir=None):
+        """
+        Args:
+            db_path: Path to the SQLite database file
+            spool_path: Optional JSONL file that lets queued writes survive
+                a process crash (see the module docstring)
+            max_batch: Commit once this many statements are pending
+            max_delay: Commit at most this many seconds after the first
+                pending statement arrived
+            partition_dir: Optional partition folder; incident and ticket
+                inserts are then routed to per-year partitions
+        """
+        self.db_path = db_path
+        self.spool_path = spool_path
+        self.partition_dir = partition_dir
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+
+        self._queue = queue.Queue()
+        self._spool_lock = threading.Lock()
+        self._spool_file = None
+        self._next_seq = 1
+        self._thread = None
+        self._stats = {"statements": 0, "batches": 0, "errors": 0}
+
+    # ---------------------- LIFECYCLE ----------------------
+    def start(self):
+        """Open the writer connection, replay the spool and start the writer thread."""
+        if self._thread is not None:
+            return self
+
+        # Connecting here first makes setup errors (e.g. more partitions
+        # than can be attached) raise in the caller, not the writer thread
+        conn = self._connect()
+        if self.spool_path is not None:
+            self._replay_spool(conn)
+        conn.close()
+        if self.spool_path is not None:
+            self._spool_file = open(self.spool_path, "a", encoding="utf-8")
+
+        self._thread = threading.Thread(target=self._run, name="ingest-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Commit everything already queued, then stop the writer thread."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+        if self._spool_file is not None:
+            self._spool_file.close()
+            self._spool_file = None
+
+    def flush(self):
+        """Block until every statement queued so far has been committed."""
+        marker = Future()
+        self._queue.put(marker)
+        marker.result()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def get_stats(self):
+        """Return statement, batch and error counters."""
+        return dict(self._stats, pending=self._queue.qsize())
+
+    # ---------------------- PRODUCER API ----------------------
+    def submit(self, sql, params=(), table=None):
+        """
+        Queue one write statement.
+
+        Args:
+            sql: INSERT/UPDATE/DELETE statement
+            params: Statement parameters (must be JSON-serialisable when
+                a spool is used)
+            table: Table written to, used to invalidate cached queries
+
+        Returns:
+            Future: resolves to the statement's lastrowid
+        """
+        return self._enqueue(sql, tuple(params), table)
+
+    def _enqueue(self, sql, params, table):
+        """Spool and queue one write; sql None means a routed row insert."""
+        if self._thread is None:
+            raise RuntimeError("IngestService is not running; call start() first")
+
+        future = Future()
+
+        if self._spool_file is None:
+            self._queue.put((0, sql, params, table, future))
+            return future
+
+        # Spool and enqueue under one lock so the spool order matches the queue
+        with self._spool_lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            record = {"seq": seq, "sql": sql, "params": params, "table": table}
+            self._spool_file.write(json.dumps(record) + "\n")
+            self._spool_file.flush()
+            self._queue.put((seq, sql, params, table, future))
+        return future
+
+    def submit_row(self, sql, table, row):
+        """
+        Queue an insert of a row dict, routed to its partition when
+        partition_dir is set and otherwise run with sql (whose columns
+        must be in the row's order).
+        """
+        if self.partition_dir is not None:
+            return self._enqueue(None, dict(row), table)
+        return self.submit(sql, tuple(row.values()), table)
+
+    def submit_incident(self, incident_id, timestamp, severity, category, status,
+                        description=None, reported_by=None):
+        """Queue a cyber_incidents insert."""
+        return self.submit_row(INSERT_CYBER_INCIDENT_SQL, "cyber_incidents", dict(
+            incident_id=incident_id, timestamp=timestamp, severity=severity, category=category,
+            status=status, description=description, reported_by=reported_by,
+        ))
+
+    def submit_ticket(self, ticket_id, priority, description, status="Open",
+                      assigned_to=None, created_at=None, resolution_time_hours=None):
+        """Queue an it_tickets insert (created_at defaults to now)."""
+        if created_at is None:
+            created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return self.submit_row(INSERT_IT_TICKET_SQL, "it_tickets", dict(
+            ticket_id=ticket_id, priority=priority, description=description, status=status,
+            assigned_to=assigned_to, created_at=created_at,
+            resolution_time_hours=resolution_time_hours,
+        ))
+
+    # ---------------------- WRITER ----------------------
+    def _connect(self):
+        conn = connect_database(self.db_path)
+        # Autocommit mode: transactions are opened explicitly per batch
+        conn.isolation_level = None
+        if self.partition_dir is not None:
+            enable_partitioning(conn, self.partition_dir)
+        return conn
+
+    def _route(self, conn, batch):
+        """
+        Turn routed row inserts into INSERTs on their partition.
+
+        Runs before the batch transaction, since a new partition has to be
+        ATTACHed. A row that cannot be routed keeps sql None and carries
+        its error in place of the parameters.
+        """
+        routed = []
+        for seq, sql, params, table, future in batch:
+            if sql is None:
+                try:
+                    # A spooled routed row replayed without partitioning
+                    # goes to the main table
+                    schema = "main"
+                    if self.partition_dir is not None:
+                        schema = partition_schema(conn, table, params, self.partition_dir)
+                    columns = list(params)
+                    sql = partition_insert_sql(schema, table, columns)
+                    params = tuple(params[c] for c in columns)
+                except (RuntimeError, sqlite3.Error) as e:
+                    params = e
+            routed.append((seq, sql, params, table, future))
+        return routed
+
+    def _run(self):
+        # sqlite3 connections belong to the thread that opened them
+        conn = self._connect()
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batch, markers = [], []
+            deadline = time.monotonic() + self.max_delay
+
+            # Collect until the batch is full or the delay has passed
+            while True:
+                if item is _STOP:
+                    stopping = True
+                elif isinstance(item, Future):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+
+                if stopping or len(batch) >= self.max_batch:
+                    break
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        item = self._queue.get(timeout=remaining)
+                    else:
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._commit_batch(conn, batch)
+            for marker in markers:
+                marker.set_result(None)
+
+        self._truncate_spool()
+        conn.close()
+
+    def _commit_batch(self, conn, batch):
+        results = []
+        batch = self._route(conn, batch)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for seq, sql, params, table, future in batch:
+                if sql is None:
+                    results.append((future, None, params))
+                    continue
+                # A savepoint per statement keeps one bad row from
+                # rolling back the rest of the group
+                conn.execute("SAVEPOINT ingest_row")
+                try:
+                    cursor = conn.execute(sql, params)
+                    results.append((future, cursor.lastrowid, None))
+                    conn.execute("RELEASE ingest_row")
+                except sqlite3.Error as e:
+                    conn.execute("ROLLBACK TO ingest_row")
+                    conn.execute("RELEASE ingest_row")
+                    results.append((future, None, e))
+
+            last_seq = max(item[0] for item in batch)
+            if last_seq:
+                conn.execute(
+                    "UPDATE ingest_spool_state SET last_seq = ? WHERE id = 1", (last_seq,)
+                )
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            self._stats["errors"] += len(batch)
+            for item in batch:
+                item[4].set_exception(e)
+            return
+
+        bump_table_generation(*{item[3] for item in batch if item[3]})
+        self._stats["batches"] += 1
+        self._stats["statements"] += len(batch)
+
+        for future, rowid, error in results:
+            if error is None:
+                future.set_result(rowid)
+            else:
+                self._stats["errors"] += 1
+                future.set_exception(error)
+
+        if self._queue.empty():
+            self._truncate_spool()
+
+    # ---------------------- SPOOL ----------------------
+    def _replay_spool(self, conn):
+        """Create the spool state table and re-apply uncommitted spool records."""
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS ingest_spool_state "
+            "(id INTEGER PRIMARY KEY CHECK (id = 1), last_seq INTEGER NOT NULL)"
+        )
+        conn.execute("INSERT OR IGNORE INTO ingest_spool_state (id, last_seq) VALUES (1, 0)")
+        last_seq = conn.execute("SELECT last_seq FROM ingest_spool_state").fetchone()[0]
+
+        pending = []
+        if os.path.exists(self.spool_path):
+            with open(self.spool_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Torn final line from a crash mid-write
+                        continue
+                    if record["seq"] > last_seq:
+                        pending.append(record)
+
+        if pending:
+            batch = [
+                (r["seq"], r["sql"], r["params"] if r["sql"] is None else tuple(r["params"]),
+                 r.get("table"), Future())
+                for r in pending
+            ]
+            self._commit_batch(conn, batch)
+            print(f" Replayed {len(pending)} spooled writes from {self.spool_path}")
+
+        # Keep numbering above everything already committed
+        last_seq = conn.execute("SELECT last_seq FROM ingest_spool_state").fetchone()[0]
+        self._next_seq = last_seq + 1
+        self._truncate_spool()
+
+    def _truncate_spool(self):
+        """Empty the spool once every record in it has been committed."""
+        if self.spool_path is None:
+            return
+        with self._spool_lock:
+            if not self._queue.empty():
+                return
+            if self._spool_file is not None:
+                self._spool_file.truncate(0)
+                self._spool_file.seek(0)
+            else:
+                open(self.spool_path, "w").close()
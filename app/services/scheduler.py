@@ -0,0 +1,154 @@
+"""
+Lightweight interval scheduler for the long-running service mode
+Jobs are plain callables registered with an interval. Each run is
+scheduled interval seconds after the previous one, plus or minus a random
+jitter so jobs with the same interval do not all fire together. A job
+holds a non-blocking lock while it runs, so a run that is still going is
+never started a second time (the overlapping run is skipped and counted).
+
+Jobs run on the thread that calls run() (the main thread in service
+mode), so they can share that thread's warm SQLite connection.
+"""
+
+import json
+import random
+import threading
+import time
+from datetime import datetime
+
+# Fraction of the interval a run may be moved earlier or later
+DEFAULT_JITTER = 0.1
+
+# Longest sleep between checks for due jobs, in seconds
+MAX_IDLE = 1.0
+
+
+class Job:
+    """One scheduled job and its run statistics."""
+
+    def __init__(self, name, func, interval, jitter):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.lock = threading.Lock()
+        self.next_run = 0.0
+        self.stats = {
+            "runs": 0,
+            "failures": 0,
+            "skipped": 0,
+            "last_duration": None,
+            "total_duration": 0.0,
+            "last_success": None,
+            "last_error": None,
+        }
+
+    def schedule_next(self, now):
+        spread = self.interval * self.jitter
+        self.next_run = now + self.interval + random.uniform(-spread, spread)
+
+
+class Scheduler:
+    """Runs registered jobs at jittered intervals with overlap protection."""
+
+    def __init__(self, status_path=None):
+        """
+        Args:
+            status_path: Optional JSON file rewritten with get_stats()
+                after every run, for monitoring from outside the process
+        """
+        self.status_path = status_path
+        self._jobs = {}
+        self._stop = threading.Event()
+
+    def add_job(self, name, func, interval, jitter=DEFAULT_JITTER, run_at_start=False):
+        """
+        Register a job.
+
+        Args:
+            name: Unique job name
+            func: Callable taking no arguments
+            interval: Seconds between runs
+            jitter: Fraction of the interval to randomise each run by
+            run_at_start: Run on the first scheduler pass instead of
+                waiting one interval
+        """
+        job = Job(name, func, interval, jitter)
+        if not run_at_start:
+            job.schedule_next(time.monotonic())
+        self._jobs[name] = job
+        return job
+
+    def run_job(self, name):
+        """
+        Run a job now unless it is already running.
+
+        Returns:
+            bool: True if the job ran and succeeded
+        """
+        job = self._jobs[name]
+        if not job.lock.acquire(blocking=False):
+            job.stats["skipped"] += 1
+            print(f" Job '{name}' still running, skipped")
+            return False
+
+        start = time.perf_counter()
+        try:
+            job.func()
+        except Exception as e:
+            job.stats["failures"] += 1
+            job.stats["last_error"] = f"{type(e).__name__}: {e}"
+            print(f" Job '{name}' failed: {e}")
+            ok = False
+        else:
+            job.stats["last_success"] = datetime.now().isoformat(timespec="seconds")
+            ok = True
+        finally:
+            duration = time.perf_counter() - start
+            job.stats["runs"] += 1
+            job.stats["last_duration"] = duration
+            job.stats["total_duration"] += duration
+            job.schedule_next(time.monotonic())
+            job.lock.release()
+
+        self._write_status()
+        return ok
+
+    def run(self):
+        """Run due jobs until stop() is called."""
+        self._stop.clear()
+        while not self._stop.is_set():
+            now = time.monotonic()
+            for job in list(self._jobs.values()):
+                if self._stop.is_set():
+                    break
+                if job.next_run <= now:
+                    self.run_job(job.name)
+
+            next_due = min((job.next_run for job in self._jobs.values()), default=now + MAX_IDLE)
+            self._stop.wait(min(max(next_due - time.monotonic(), 0), MAX_IDLE))
+
+    def stop(self):
+        """Ask run() to return after the job currently running (if any)."""
+        self._stop.set()
+
+    def get_stats(self):
+        """Return per-job run counts, durations and last success/error."""
+        stats = {}
+        for name, job in self._jobs.items():
+            runs = job.stats["runs"]
+            stats[name] = dict(
+                job.stats,
+                interval=job.interval,
+                running=job.lock.locked(),
+                average_duration=job.stats["total_duration"] / runs if runs else None,
+                next_run_in=max(job.next_run - time.monotonic(), 0),
+            )
+        return stats
+
+    def _write_status(self):
+        if self.status_path is None:
+            return
+        partial = self.status_path.with_suffix(".tmp")
+        partial.write_text(json.dumps(self.get_stats(), indent=2))
+        partial.replace(self.status_path)
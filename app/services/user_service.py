@@ -1,10 +1,10 @@
-import bcrypt
 import sqlite3
 from pathlib import Path
 
 from app.data.db import connect_database
 from app.data.users import get_user_by_username, insert_user
 from app.data.schema import create_users_table
+from app.data.access import Principal
 
 #  FIX: Define DATA_DIR so migrate_users_from_file works
 DATA_DIR = Path("DATA")
@@ -12,6 +12,8 @@ DATA_DIR = Path("DATA")
 
 def register_user(username, password, role='user'):
     """Register new user with password hashing."""
+    import bcrypt
+
     # Hash password
     password_hash = bcrypt.hashpw(
         password.encode('utf-8'),
@@ -30,17 +32,37 @@ def login_user(username, password):
         return False, "User not found."
 
     # Verify password
+    import bcrypt
     stored_hash = user[2]  # password_hash column
     if bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8')):
         return True, "Login successful!"
     return False, "Incorrect password."
 
 
+def authenticate_user(username, password):
+    """
+    Authenticate a user and return who they are.
+
+    Returns:
+        Principal or None: (username, role) on success, None otherwise
+    """
+    import bcrypt
+
+    user = get_user_by_username(username)
+    if not user:
+        return None
+
+    # user row: id, username, password_hash, role, created_at
+    if not bcrypt.checkpw(password.encode('utf-8'), user[2].encode('utf-8')):
+        return None
+    return Principal(user[1], user[3] or 'user')
+
+
 def migrate_users_from_file(conn, filepath=DATA_DIR / "users.txt"):
     """
     Migrate users from users.txt to the database.
-    Example format of file:
-        alice,$2b$12$abcd...
+    Example format of file (role is optional, default 'user'):
+        alice,$2b$12$abcd...,analyst
         bob,$2b$12$xyz...
     """
     if not filepath.exists():
@@ -64,11 +86,12 @@ def migrate_users_from_file(conn, filepath=DATA_DIR / "users.txt"):
 
             username = parts[0]
             password_hash = parts[1]
+            role = parts[2] if len(parts) > 2 and parts[2] else 'user'
 
             try:
                 cursor.execute(
                     "INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-                    (username, password_hash, 'user')
+                    (username, password_hash, role)
                 )
 
                 if cursor.rowcount > 0:
@@ -0,0 +1,93 @@
+"""
+Benchmark: write overhead of the change-data-capture triggers.
+
+Runs the same insert / update / delete workload on cyber_incidents with
+and without the CDC triggers, then compacts the resulting change log.
+
+Usage:
+    python benchmarks/bench_cdc.py [rows]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.data.changes import commit_checkpoint, compact_change_log
+from app.data.db import connect_database
+from app.data.schema import create_all_tables
+
+STATUSES = ["Open", "In Progress", "Resolved", "Closed"]
+
+
+def workload(conn, rows):
+    """Insert rows, update each twice, delete a tenth; return phase timings."""
+    timings = {}
+
+    start = time.perf_counter()
+    conn.executemany(
+        "INSERT INTO cyber_incidents (incident_id, timestamp, severity, category, status, description) "
+        "VALUES (?, '2024-01-01 00:00:00', 'High', 'Malware', 'Open', 'bench')",
+        ((str(i),) for i in range(rows))
+    )
+    conn.commit()
+    timings["insert"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for status in STATUSES[1:3]:
+        conn.execute("UPDATE cyber_incidents SET status = ?", (status,))
+    conn.commit()
+    timings["update x2"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    conn.execute("DELETE FROM cyber_incidents WHERE rowid % 10 = 0")
+    conn.commit()
+    timings["delete 10%"] = time.perf_counter() - start
+
+    return timings
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = connect_database(Path(tmp) / "plain.db")
+        create_all_tables(plain)
+        for op in ("i", "u", "d"):
+            plain.execute(f"DROP TRIGGER trg_cyber_incidents_cdc_{op}")
+
+        cdc = connect_database(Path(tmp) / "cdc.db")
+        create_all_tables(cdc)
+
+        base = workload(plain, rows)
+        with_cdc = workload(cdc, rows)
+
+        print(f"\n{rows} incidents")
+        print(f"{'Phase':<14}{'No CDC':>12}{'CDC':>12}{'Overhead':>11}")
+        print("-" * 49)
+        for phase in base:
+            overhead = with_cdc[phase] / base[phase] - 1
+            print(f"{phase:<14}{base[phase] * 1000:>10.1f}ms{with_cdc[phase] * 1000:>10.1f}ms{overhead:>10.0%}")
+        total_base, total_cdc = sum(base.values()), sum(with_cdc.values())
+        print(f"{'total':<14}{total_base * 1000:>10.1f}ms{total_cdc * 1000:>10.1f}ms"
+              f"{total_cdc / total_base - 1:>10.0%}")
+
+        before = cdc.execute("SELECT COUNT(*) FROM change_log").fetchone()[0]
+        last_seq = cdc.execute("SELECT MAX(seq) FROM change_log").fetchone()[0]
+        commit_checkpoint(cdc, "bench", last_seq)
+
+        start = time.perf_counter()
+        compact_change_log(cdc)
+        elapsed = time.perf_counter() - start
+        after = cdc.execute("SELECT COUNT(*) FROM change_log").fetchone()[0]
+
+        print(f"\nCompaction: {before} → {after} change rows in {elapsed * 1000:.1f} ms")
+
+        plain.close()
+        cdc.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmark: incident <-> ticket correlation.
+
+Fills cyber_incidents and it_tickets with random timestamps over three
+years, then compares the sorted binary-search sweep of
+app/data/correlation.py with a Python nested loop (extrapolated from a
+sample) and with the same time-window join done in SQL (an indexed nested
+loop). Finding the pairs and storing them are timed separately, followed
+by lookups in both directions.
+
+Usage:
+    python benchmarks/bench_correlation.py [incidents] [tickets] [window_seconds]
+    python benchmarks/bench_correlation.py 1000000 1000000 600
+"""
+
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas  # noqa: F401  (imported up front so no timing includes it)
+
+from app.data.correlation import (
+    get_incidents_for_ticket, get_tickets_for_incident, rebuild_correlations, window_ranges,
+)
+from app.data.db import connect_database
+from app.data.schema import create_all_tables
+
+SPAN_SECONDS = 3 * 365 * 24 * 3600
+EPOCH = datetime(2022, 1, 1)
+
+
+def random_times(count):
+    return [
+        (EPOCH + timedelta(seconds=random.randrange(SPAN_SECONDS))).strftime("%Y-%m-%d %H:%M:%S")
+        for _ in range(count)
+    ]
+
+
+def fill(conn, incidents, tickets):
+    # CDC triggers are not part of what is measured here
+    for table in ("cyber_incidents", "it_tickets"):
+        for op in ("i", "u", "d"):
+            conn.execute(f"DROP TRIGGER trg_{table}_cdc_{op}")
+
+    conn.executemany(
+        "INSERT INTO cyber_incidents (incident_id, timestamp, severity, category, status) "
+        "VALUES (?, ?, 'High', 'Malware', 'Open')",
+        ((str(i), ts) for i, ts in enumerate(random_times(incidents)))
+    )
+    conn.executemany(
+        "INSERT INTO it_tickets (ticket_id, priority, status, created_at) "
+        "VALUES (?, 'High', 'Open', ?)",
+        ((str(i), ts) for i, ts in enumerate(random_times(tickets)))
+    )
+    conn.commit()
+
+
+JOIN_SQL = """
+FROM cyber_incidents i
+JOIN it_tickets t
+  ON t.created_at BETWEEN datetime(i.timestamp, '-{window} seconds')
+                      AND datetime(i.timestamp, '+{window} seconds')
+"""
+
+
+def nested_loop_estimate(conn, window, sample=200):
+    """Time an O(N x M) Python loop on a sample of incidents and extrapolate."""
+    ranges = window_ranges(conn, window, window)
+    incident_times, ticket_times = ranges[1], ranges[3].tolist()
+    picked = random.sample(incident_times.tolist(), min(sample, len(incident_times)))
+
+    start = time.perf_counter()
+    for incident_time in picked:
+        [t for t in ticket_times if incident_time - window <= t <= incident_time + window]
+    return (time.perf_counter() - start) / len(picked) * len(incident_times)
+
+
+def main():
+    incidents = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    tickets = int(sys.argv[2]) if len(sys.argv) > 2 else incidents
+    window = int(sys.argv[3]) if len(sys.argv) > 3 else 600
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = connect_database(Path(tmp) / "bench.db")
+        create_all_tables(conn)
+
+        start = time.perf_counter()
+        fill(conn, incidents, tickets)
+        print(f"\nLoaded {incidents} incidents and {tickets} tickets in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        sql_links = conn.execute("SELECT COUNT(*)" + JOIN_SQL.format(window=window)).fetchone()[0]
+        sql_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        links = int(window_ranges(conn, window, window)[5].sum())
+        sweep_time = time.perf_counter() - start
+
+        assert links == sql_links, (links, sql_links)
+        nested_time = nested_loop_estimate(conn, window)
+
+        start = time.perf_counter()
+        conn.execute("DELETE FROM incident_ticket_links")
+        conn.execute(
+            "INSERT INTO incident_ticket_links (incident_id, ticket_id, lag_seconds) "
+            "SELECT i.incident_id, t.ticket_id, "
+            "unixepoch(t.created_at) - unixepoch(i.timestamp)" + JOIN_SQL.format(window=window)
+        )
+        conn.commit()
+        sql_store_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rebuild_correlations(conn, before=window, after=window)
+        rebuild_time = time.perf_counter() - start
+
+        lookups = 1000
+        start = time.perf_counter()
+        for i in random.sample(range(incidents), lookups):
+            get_tickets_for_incident(conn, i)
+        by_incident = (time.perf_counter() - start) / lookups
+
+        start = time.perf_counter()
+        for i in random.sample(range(tickets), lookups):
+            get_incidents_for_ticket(conn, i)
+        by_ticket = (time.perf_counter() - start) / lookups
+
+        print(f"\n{incidents} x {tickets}, window ±{window}s, {links} links")
+        print(f"{'':<24}{'find pairs':>12}{'find + store':>14}")
+        print("-" * 50)
+        print(f"{'Python nested loop':<24}{nested_time:>11.1f}s{'(estimate)':>14}")
+        print(f"{'SQL indexed join':<24}{sql_time:>11.2f}s{sql_store_time:>13.2f}s")
+        print(f"{'sort + search sweep':<24}{sweep_time:>11.2f}s{rebuild_time:>13.2f}s")
+        print()
+        print(f"incident -> tickets:    {by_incident * 1000:.2f} ms/lookup")
+        print(f"ticket -> incidents:    {by_ticket * 1000:.2f} ms/lookup")
+
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
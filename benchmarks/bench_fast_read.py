@@ -0,0 +1,123 @@
+"""
+Benchmark: pd.read_sql_query vs read_sql_fast on cyber_incidents.
+
+Builds a temporary database with N synthetic incidents and reports the
+wall time (best of 3), peak Python allocation (tracemalloc) and final
+DataFrame size of each read path. "read_sql_query + astype" converts the
+baseline to the same dtypes that read_sql_fast returns.
+
+Usage:
+    python benchmarks/bench_fast_read.py [rows]
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+
+from app.data.fastread import read_sql_fast
+from app.data.schema import COLUMN_DTYPES, create_cyber_incidents_table
+
+
+def build_database(path, rows):
+    conn = sqlite3.connect(path)
+    create_cyber_incidents_table(conn)
+
+    severities = ["Low", "Medium", "High", "Critical"]
+    categories = ["Malware", "Phishing", "DDoS", "Insider Threat", "Misconfiguration"]
+    statuses = ["Open", "In Progress", "Resolved", "Closed"]
+
+    data = (
+        (
+            str(i),
+            f"2024-{random.randint(1, 12):02d}-{random.randint(1, 28):02d} "
+            f"{random.randint(0, 23):02d}:00:00.000000",
+            random.choice(severities),
+            random.choice(categories),
+            random.choice(statuses),
+            f"Incident {i} description",
+        )
+        for i in range(rows)
+    )
+    conn.executemany(
+        "INSERT INTO cyber_incidents "
+        "(incident_id, timestamp, severity, category, status, description) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        data,
+    )
+    conn.commit()
+    return conn
+
+
+def read_sql_query_typed(conn, query, dtypes):
+    """Baseline that produces the same dtypes as read_sql_fast."""
+    df = pd.read_sql_query(query, conn)
+    for column, dtype in dtypes.items():
+        if dtype == "datetime64[ns]":
+            df[column] = pd.to_datetime(df[column], errors="coerce", format="ISO8601")
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def measure(label, func, repeat=3):
+    # Best-of-N wall time without tracing, then one traced run for memory
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = func()
+        elapsed = min(elapsed, time.perf_counter() - start)
+        del df
+
+    tracemalloc.start()
+    df = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    size = df.memory_usage(deep=True).sum()
+    print(f"{label:<28}{elapsed * 1000:>10.1f} ms{peak / 2**20:>12.1f} MiB{size / 2**20:>12.1f} MiB")
+    return elapsed, peak
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    query = "SELECT * FROM cyber_incidents"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = build_database(os.path.join(tmp, "bench.db"), rows)
+
+        print(f"\nReading {rows} incidents")
+        print(f"{'Path':<28}{'Time':>13}{'Peak alloc':>16}{'DataFrame':>16}")
+        print("-" * 73)
+
+        dtypes = COLUMN_DTYPES["cyber_incidents"]
+        base_time, base_peak = measure(
+            "read_sql_query", lambda: pd.read_sql_query(query, conn)
+        )
+        typed_time, typed_peak = measure(
+            "read_sql_query + astype",
+            lambda: read_sql_query_typed(conn, query, dtypes),
+        )
+        fast_time, fast_peak = measure(
+            "read_sql_fast", lambda: read_sql_fast(conn, query, dtypes=dtypes)
+        )
+
+        print("-" * 73)
+        print(f"vs read_sql_query:          {base_time / fast_time:.2f}x speed, "
+              f"{fast_peak / base_peak:.0%} peak memory")
+        print(f"vs read_sql_query + astype: {typed_time / fast_time:.2f}x speed, "
+              f"{fast_peak / typed_peak:.0%} peak memory")
+
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
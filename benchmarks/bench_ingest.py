@@ -0,0 +1,111 @@
+"""
+Benchmark: sustained ticket writes/s with 16 producer threads.
+
+Compares
+  * direct   - every producer opens its own connection per write and
+               commits it
+  * ingest   - producers submit to one IngestService (group commit)
+  * ingest+spool - same, with the durable JSONL spool enabled
+
+Usage:
+    python benchmarks/bench_ingest.py [writes_per_thread]
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.data.db import connect_database
+from app.data.schema import create_all_tables
+from app.data.tickets import INSERT_IT_TICKET_SQL
+from app.services.ingest_service import IngestService
+
+THREADS = 16
+CREATED_AT = "2024-06-01 09:00:00"
+
+
+def new_database(folder, name):
+    """Create a database with the real application schema (CDC triggers included)."""
+    path = Path(folder) / name
+    conn = connect_database(path)
+    create_all_tables(conn)
+    conn.close()
+    return path
+
+
+def run_threads(worker, writes):
+    threads = [threading.Thread(target=worker, args=(i, writes)) for i in range(THREADS)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+
+def bench_direct(path, writes):
+    errors = []
+
+    def worker(n, count):
+        for i in range(count):
+            try:
+                conn = connect_database(path)
+                conn.execute(INSERT_IT_TICKET_SQL,
+                             (f"t{n}-{i}", "Medium", "bench", "Open", None, CREATED_AT, None))
+                conn.commit()
+                conn.close()
+            except sqlite3.OperationalError as e:
+                errors.append(e)
+
+    elapsed = run_threads(worker, writes)
+    return elapsed, len(errors)
+
+
+def bench_ingest(path, writes, spool_path=None):
+    errors = []
+
+    with IngestService(path, spool_path=spool_path) as service:
+        def worker(n, count):
+            futures = [
+                service.submit_ticket(f"t{n}-{i}", "Medium", "bench", created_at=CREATED_AT)
+                for i in range(count)
+            ]
+            for future in futures:
+                if future.exception() is not None:
+                    errors.append(future.exception())
+
+        elapsed = run_threads(worker, writes)
+        stats = service.get_stats()
+
+    return elapsed, len(errors), stats["batches"]
+
+
+def main():
+    writes = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    total = writes * THREADS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"\n{THREADS} producer threads x {writes} writes = {total} tickets")
+        print(f"{'Mode':<16}{'Time':>10}{'Writes/s':>12}{'Errors':>9}{'Commits':>10}")
+        print("-" * 57)
+
+        elapsed, errors = bench_direct(new_database(tmp, "direct.db"), writes)
+        print(f"{'direct':<16}{elapsed:>9.2f}s{(total - errors) / elapsed:>12.0f}{errors:>9}{total - errors:>10}")
+
+        elapsed, errors, batches = bench_ingest(new_database(tmp, "ingest.db"), writes)
+        print(f"{'ingest':<16}{elapsed:>9.2f}s{(total - errors) / elapsed:>12.0f}{errors:>9}{batches:>10}")
+
+        elapsed, errors, batches = bench_ingest(
+            new_database(tmp, "spool.db"), writes, spool_path=os.path.join(tmp, "ingest.spool")
+        )
+        print(f"{'ingest+spool':<16}{elapsed:>9.2f}s{(total - errors) / elapsed:>12.0f}{errors:>9}{batches:>10}")
+
+
+if __name__ == "__main__":
+    main()
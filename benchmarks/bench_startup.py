@@ -0,0 +1,90 @@
+"""
+Benchmark: cold-start import cost and schema bootstrap.
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters for
+each entry point, reports the median cumulative import time and which
+heavy dependencies were loaded, then times create_all_tables() on a new
+database and on an already-current one.
+
+Usage:
+    python benchmarks/bench_startup.py [runs]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.data.db import connect_database
+from app.data.schema import create_all_tables
+
+ENTRY_POINTS = [
+    "main",
+    "auth",
+    "app.services.user_service",
+    "app.data.incidents",
+    "app.data.tickets",
+]
+HEAVY_MODULES = ["pandas", "numpy", "bcrypt"]
+
+
+def import_profile(module):
+    """Return (cumulative microseconds, heavy modules loaded) for one import."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    total = 0
+    loaded = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line.split("|")
+        name = parts[2].strip()
+        if name == module:
+            total = int(parts[1])
+        if name in HEAVY_MODULES:
+            loaded.add(name)
+    return total, loaded
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print(f"\nImport time (median of {runs} cold interpreters)")
+    print(f"{'Module':<30}{'Time':>10}  Heavy deps loaded")
+    print("-" * 65)
+    for module in ENTRY_POINTS:
+        samples = []
+        loaded = set()
+        for _ in range(runs):
+            total, loaded = import_profile(module)
+            samples.append(total)
+        heavy = ", ".join(sorted(loaded)) or "-"
+        print(f"{module:<30}{statistics.median(samples) / 1000:>8.1f}ms  {heavy}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = connect_database(Path(tmp) / "bench.db")
+
+        start = time.perf_counter()
+        create_all_tables(conn)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        create_all_tables(conn)
+        warm = time.perf_counter() - start
+        conn.close()
+
+    print("\nSchema bootstrap")
+    print(f"  new database:     {cold * 1000:.2f} ms")
+    print(f"  version current:  {warm * 1000:.3f} ms (skipped)")
+
+
+if __name__ == "__main__":
+    main()
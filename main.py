@@ -1,4 +1,4 @@
-import pandas as pd
+import argparse
 
 from app.data.db import connect_database, DB_PATH
 from app.data.schema import create_all_tables
@@ -57,6 +57,9 @@ def run_comprehensive_tests():
     print("🧪 RUNNING COMPREHENSIVE TESTS")
     print("="*60)
 
+    # pandas is only needed for the read-back check below
+    import pandas as pd
+
     conn = connect_database()
 
     # Test 1: Authentication
@@ -84,7 +87,7 @@ def run_comprehensive_tests():
 
     # READ
     df = pd.read_sql_query(
-        "SELECT * FROM cyber_incidents WHERE id = ?",
+        "SELECT * FROM cyber_incidents WHERE incident_id = ?",
         conn,
         params=(test_id,)
     )
@@ -114,7 +117,108 @@ def run_comprehensive_tests():
     print("="*60)
 
 
-def main():
+# ---------------------- SERVICE MODE ----------------------
+# Seconds between scheduled job runs in service mode
+CSV_REFRESH_INTERVAL = 300
+MAINTENANCE_INTERVAL = 3600
+ROLLUP_INTERVAL = 60
+
+SERVICE_STATUS_PATH = DB_PATH.parent / "service_status.json"
+
+
+def run_service():
+    """
+    Run as a long-running service until SIGINT/SIGTERM.
+
+    Keeps one warm connection (schema checked once, query cache kept in
+    memory) and runs the refresh jobs on a scheduler. Job durations and
+    last-success times are written to DATA/service_status.json after
+    every run. On shutdown the running job finishes, pending changes are
+    committed, then the connection is closed.
+    """
+    import signal
+
+    from app.data.cache import get_table_generation
+    from app.data.correlation import rebuild_correlations
+    from app.data.datasets import refresh_csv_data
+    from app.data.db import run_maintenance
+    from app.data.planner import check_query_plans
+    from app.services.scheduler import Scheduler
+
+    print("\n" + "="*60)
+    print("STARTING SERVICE MODE")
+    print("="*60)
+
+    conn = connect_database()
+    create_all_tables(conn)
+    migrate_users_from_file(conn)
+
+    scheduler = Scheduler(status_path=SERVICE_STATUS_PATH)
+
+    csv_fingerprints = {}
+    correlated = {"generations": None}
+
+    def refresh_rollups():
+        # Re-run the analytics so their cached results are warm; the cache
+        # only recomputes the ones whose tables changed
+        errors = []
+        for query in (get_incidents_by_type_count, get_high_severity_by_status):
+            try:
+                query(conn)
+            except Exception as e:
+                errors.append(f"{query.__name__}: {e}")
+
+        generations = (get_table_generation("cyber_incidents"), get_table_generation("it_tickets"))
+        if generations != correlated["generations"]:
+            rebuild_correlations(conn)
+            correlated["generations"] = generations
+
+        if errors:
+            raise RuntimeError("; ".join(errors))
+
+    scheduler.add_job("csv_refresh", lambda: refresh_csv_data(conn, csv_fingerprints),
+                      CSV_REFRESH_INTERVAL, run_at_start=True)
+    scheduler.add_job("rollup_refresh", refresh_rollups, ROLLUP_INTERVAL, run_at_start=True)
+
+    def maintain():
+        run_maintenance(conn)
+        check_query_plans(conn)
+
+    scheduler.add_job("maintenance", maintain, MAINTENANCE_INTERVAL)
+
+    def handle_signal(signum, frame):
+        print(f"\nReceived {signal.Signals(signum).name}, shutting down...")
+        scheduler.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    print(f"Service running (status: {SERVICE_STATUS_PATH}). Press Ctrl+C to stop.")
+    try:
+        scheduler.run()
+    finally:
+        conn.commit()
+        conn.close()
+
+    print("\nJob summary")
+    print(f"{'Job':<18}{'Runs':>6}{'Failed':>8}{'Avg s':>9}  Last success")
+    print("-" * 60)
+    for name, stats in scheduler.get_stats().items():
+        average = f"{stats['average_duration']:.2f}" if stats["average_duration"] is not None else "-"
+        print(f"{name:<18}{stats['runs']:>6}{stats['failures']:>8}{average:>9}  {stats['last_success'] or '-'}")
+    print("SERVICE STOPPED")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Multi-Domain Intelligence Platform")
+    parser.add_argument("--serve", action="store_true",
+                        help="run as a long-running service with scheduled refresh jobs")
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        run_service()
+        return
+
     setup_database_complete()
     # Uncomment to run full tests:
     # run_comprehensive_tests()
@@ -0,0 +1,30 @@
+import pytest
+
+from app.data.cache import clear_query_cache
+from app.data.db import connect_database
+from app.data.schema import create_all_tables
+
+
+@pytest.fixture(autouse=True)
+def _fresh_query_cache():
+    clear_query_cache()
+    yield
+    clear_query_cache()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Path of a new database created with create_all_tables()."""
+    path = tmp_path / "platform.db"
+    conn = connect_database(path)
+    create_all_tables(conn)
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def conn(db_path):
+    """Open connection to the db_path database."""
+    conn = connect_database(db_path)
+    yield conn
+    conn.close()
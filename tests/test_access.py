@@ -0,0 +1,93 @@
+import csv
+
+import pytest
+
+from app.data.access import Principal, scoped_where
+from app.data.exports import export_table
+from app.data.incidents import (
+    delete_incident, get_all_incidents, get_incidents_by_type_count, insert_incident,
+    update_incident_status,
+)
+
+ALICE = Principal("alice", "analyst")
+BOB = Principal("bob", "user")
+ADMIN = Principal("root", "admin")
+
+
+@pytest.fixture
+def incidents(conn):
+    insert_incident(conn, "2024-05-01 09:00:00", "Phishing", "High", "Open", "a1", incident_id="I-1",
+                    principal=ALICE)
+    insert_incident(conn, "2024-05-01 10:00:00", "Malware", "Low", "Open", "a2", incident_id="I-2",
+                    principal=ALICE)
+    insert_incident(conn, "2024-05-02 09:00:00", "Phishing", "Medium", "Open", "b1", incident_id="I-3",
+                    principal=BOB)
+    return conn
+
+
+def test_missing_permissions_are_denied(incidents, tmp_path):
+    conn = incidents
+
+    with pytest.raises(PermissionError):
+        update_incident_status(conn, "I-3", "Closed", principal=BOB)
+    with pytest.raises(PermissionError):
+        delete_incident(conn, "I-1", principal=ALICE)
+    with pytest.raises(PermissionError):
+        export_table(conn, "cyber_incidents", tmp_path / "out.csv", principal=BOB)
+    assert not (tmp_path / "out.csv").exists()
+
+
+def test_user_and_analyst_only_see_their_rows(incidents):
+    conn = incidents
+
+    assert sorted(get_all_incidents(conn, principal=ALICE)["incident_id"]) == ["I-1", "I-2"]
+    assert get_all_incidents(conn, principal=BOB)["incident_id"].tolist() == ["I-3"]
+    assert len(get_all_incidents(conn, principal=ADMIN)) == 3
+    assert len(get_all_incidents(conn)) == 3
+
+
+def test_unknown_role_sees_nothing(incidents):
+    conn = incidents
+    guest = Principal("alice", "guest")
+
+    with pytest.raises(PermissionError):
+        get_all_incidents(conn, principal=guest)
+    where, params = scoped_where(guest, "cyber_incidents")
+    assert conn.execute("SELECT COUNT(*) FROM cyber_incidents" + where, params).fetchone()[0] == 0
+
+
+def test_export_is_scoped(incidents, tmp_path):
+    conn = incidents
+    dest = tmp_path / "incidents.csv"
+
+    stats = export_table(conn, "cyber_incidents", dest, columns=["incident_id", "reported_by"],
+                         principal=ALICE)
+
+    with open(dest, newline="") as f:
+        rows = list(csv.reader(f))
+    assert stats["rows"] == 2
+    assert rows == [["incident_id", "reported_by"], ["I-1", "alice"], ["I-2", "alice"]]
+
+
+def test_cache_entries_are_kept_per_principal(incidents):
+    conn = incidents
+
+    alice = get_incidents_by_type_count(conn, principal=ALICE)
+    bob = get_incidents_by_type_count(conn, principal=BOB)
+
+    assert dict(zip(alice["category"], alice["count"])) == {"Phishing": 1, "Malware": 1}
+    assert bob.to_dict("records") == [{"category": "Phishing", "count": 1}]
+    assert get_incidents_by_type_count(conn, principal=ALICE).equals(alice)
+
+
+def test_update_and_delete_are_scoped(incidents):
+    conn = incidents
+
+    assert update_incident_status(conn, "I-3", "Closed", principal=ALICE) == 0
+    assert update_incident_status(conn, "I-1", "Closed", principal=ALICE) == 1
+    assert conn.execute(
+        "SELECT incident_id FROM cyber_incidents WHERE status = 'Closed'"
+    ).fetchall() == [("I-1",)]
+
+    assert delete_incident(conn, "I-3", principal=ADMIN) == 1
+    assert conn.execute("SELECT COUNT(*) FROM cyber_incidents").fetchone()[0] == 2
@@ -0,0 +1,80 @@
+import pandas as pd
+
+from app.data import cache
+from app.data.cache import bump_table_generation, cached_query, get_cache_stats
+from app.data.db import connect_database
+from app.data.incidents import insert_incident
+
+calls = []
+
+
+@cached_query("cyber_incidents")
+def count_category(conn, category):
+    calls.append(category)
+    return pd.read_sql_query(
+        "SELECT COUNT(*) AS count FROM cyber_incidents WHERE category = ?", conn, params=(category,)
+    )
+
+
+def count(conn, category):
+    return int(count_category(conn, category)["count"].iloc[0])
+
+
+def add(conn, incident_id, category="Phishing"):
+    insert_incident(conn, "2024-05-01 09:00:00", category, "High", "Open", "test", incident_id=incident_id)
+
+
+def test_hit_and_miss(conn):
+    calls.clear()
+    add(conn, "I-1")
+
+    assert count(conn, "Phishing") == 1
+    assert count(conn, category="Phishing") == 1
+    assert count(conn, "Malware") == 0
+
+    assert calls == ["Phishing", "Malware"]
+    assert get_cache_stats() == {"hits": 1, "misses": 2, "evictions": 0, "size": 2}
+
+
+def test_writes_bump_the_generation(conn):
+    calls.clear()
+    add(conn, "I-1")
+    assert count(conn, "Phishing") == 1
+
+    add(conn, "I-2")
+    assert count(conn, "Phishing") == 2
+    bump_table_generation("it_tickets")
+    assert count(conn, "Phishing") == 2
+
+    assert calls == ["Phishing", "Phishing"]
+
+
+def test_least_recently_used_entry_is_evicted(conn, monkeypatch):
+    monkeypatch.setattr(cache, "MAX_CACHE_ENTRIES", 2)
+    calls.clear()
+
+    count(conn, "A")
+    count(conn, "B")
+    count(conn, "A")
+    count(conn, "C")
+    count(conn, "A")
+    count(conn, "B")
+
+    assert calls == ["A", "B", "C", "B"]
+    assert get_cache_stats()["evictions"] == 2
+
+
+def test_commits_from_other_connections_invalidate(db_path, conn):
+    calls.clear()
+    add(conn, "I-1")
+    assert count(conn, "Phishing") == 1
+
+    # A write that does not go through this process's write paths
+    other = connect_database(db_path)
+    other.execute("INSERT INTO cyber_incidents (incident_id, category) VALUES ('I-2', 'Phishing')")
+    other.commit()
+    other.close()
+
+    assert count(conn, "Phishing") == 2
+    assert count(conn, "Phishing") == 2
+    assert calls == ["Phishing", "Phishing"]
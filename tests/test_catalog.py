@@ -0,0 +1,42 @@
+import os
+
+from app.data.catalog import get_column_stats, profile_csv, profile_datasets, register_dataset_file
+
+
+def write_csv(path, rows):
+    path.write_text("id,kind,score\n" + "".join(f"{i},{kind},{score}\n" for i, kind, score in rows))
+    return path
+
+
+def test_unchanged_files_are_not_profiled_again(conn, tmp_path):
+    csv_path = write_csv(tmp_path / "data.csv", [(1, "a", 1.5), (2, "b", ""), (3, "a", 4.0)])
+    register_dataset_file(conn, "D-1", csv_path)
+
+    assert profile_datasets(conn) == ["D-1"]
+    assert profile_datasets(conn) == []
+    assert profile_datasets(conn, force=True) == ["D-1"]
+
+    write_csv(csv_path, [(1, "a", 1.5), (2, "b", 2.0), (3, "a", 4.0), (4, "c", 0.5)])
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert profile_datasets(conn) == ["D-1"]
+
+    stats = get_column_stats(conn, "D-1").set_index("column_name")
+    assert stats.loc["score", "null_count"] == 0
+    assert stats.loc["score", "max_value"] == "4.0"
+    assert stats.loc["kind", "inferred_type"] == "text"
+    assert conn.execute("SELECT row_count FROM dataset_files").fetchone() == (4,)
+
+
+def test_distinct_estimates_are_close(tmp_path):
+    rows = [(i, f"k{i % 150}", i % 20000) for i in range(60000)]
+    csv_path = write_csv(tmp_path / "big.csv", rows)
+
+    profile = profile_csv(csv_path, chunksize=7000)
+    columns = {c["column_name"]: c for c in profile["columns"]}
+
+    assert profile["row_count"] == 60000
+    assert abs(columns["id"]["distinct_estimate"] - 60000) / 60000 < 0.05
+    assert abs(columns["score"]["distinct_estimate"] - 20000) / 20000 < 0.05
+    assert abs(columns["kind"]["distinct_estimate"] - 150) <= 3
+    assert columns["id"]["min_value"] == 0 and columns["id"]["max_value"] == 59999
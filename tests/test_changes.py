@@ -0,0 +1,49 @@
+from app.data.changes import compact_change_log, read_changes
+from app.data.schema import create_all_tables
+from app.data.tickets import INSERT_IT_TICKET_SQL
+
+
+def add_ticket(conn, ticket_id):
+    conn.execute(INSERT_IT_TICKET_SQL, (ticket_id, "Low", "test", "Open", None, "2024-05-01 09:00:00", None))
+
+
+def live_keys(conn):
+    return sorted(c["key"] for c in read_changes(conn) if c["op"] != "D")
+
+
+def test_reused_rowid_is_logged_under_the_new_key(conn):
+    add_ticket(conn, "a")
+    add_ticket(conn, "b")
+    conn.execute("DELETE FROM it_tickets WHERE ticket_id = 'b'")
+    add_ticket(conn, "c")
+    conn.commit()
+
+    changes = read_changes(conn)
+    assert changes[-1]["row_id"] == changes[1]["row_id"]
+    assert [(c["op"], c["key"]) for c in changes] == [("I", "a"), ("I", "b"), ("D", "b"), ("I", "c")]
+
+    compact_change_log(conn, changes[-1]["seq"])
+    assert live_keys(conn) == ["a", "c"]
+
+
+def test_key_change_logs_delete_of_old_key(conn):
+    add_ticket(conn, "a")
+    conn.execute("UPDATE it_tickets SET ticket_id = 'z' WHERE ticket_id = 'a'")
+    conn.commit()
+
+    changes = read_changes(conn)
+    assert [(c["op"], c["key"]) for c in changes] == [("I", "a"), ("D", "a"), ("U", "z")]
+
+    compact_change_log(conn, changes[-1]["seq"])
+    assert [(c["op"], c["key"]) for c in read_changes(conn)] == [("U", "z")]
+
+
+def test_upgrade_backfills_keys_of_logged_changes(conn):
+    add_ticket(conn, "a")
+    conn.execute("UPDATE change_log SET row_key = NULL")
+    conn.execute("PRAGMA user_version = 8")
+    conn.commit()
+
+    create_all_tables(conn)
+
+    assert [c["key"] for c in read_changes(conn)] == ["a"]
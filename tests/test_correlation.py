@@ -0,0 +1,62 @@
+import pytest
+
+from app.data.correlation import get_incidents_for_ticket, get_tickets_for_incident, rebuild_correlations
+from app.data.incidents import INSERT_CYBER_INCIDENT_SQL
+from app.data.tickets import INSERT_IT_TICKET_SQL
+
+
+@pytest.fixture
+def linked(conn):
+    conn.executemany(INSERT_CYBER_INCIDENT_SQL, [
+        ("I-1", "2024-05-01 12:00:00", "High", "Phishing", "Open", "", None),
+        ("I-2", "2024-05-01 12:30:00", "Low", "Malware", "Open", "", None),
+        ("I-3", "not a date", "Low", "Malware", "Open", "", None),
+    ])
+    conn.executemany(INSERT_IT_TICKET_SQL, [
+        ("T-early", "Low", "", "Open", None, "2024-05-01 10:59:59", None),
+        ("T-start", "Low", "", "Open", None, "2024-05-01 11:00:00", None),
+        ("T-near", "Low", "", "Open", None, "2024-05-01 12:10:00", None),
+        ("T-end", "Low", "", "Open", None, "2024-05-01 13:00:00", None),
+        ("T-late", "Low", "", "Open", None, "2024-05-01 13:00:01", None),
+    ])
+    conn.commit()
+    return conn
+
+
+def test_window_edges_are_inclusive(linked):
+    conn = linked
+
+    # I-1 window is 11:00:00..13:00:00, I-2 is 11:30:00..13:30:00
+    assert rebuild_correlations(conn, before=3600, after=3600, block_size=1) == 6
+    assert conn.execute(
+        "SELECT incident_id, ticket_id, lag_seconds FROM incident_ticket_links ORDER BY incident_id, lag_seconds"
+    ).fetchall() == [
+        ("I-1", "T-start", -3600), ("I-1", "T-near", 600), ("I-1", "T-end", 3600),
+        ("I-2", "T-near", -1200), ("I-2", "T-end", 1800), ("I-2", "T-late", 1801),
+    ]
+
+
+def test_rebuild_replaces_old_links(linked):
+    conn = linked
+    rebuild_correlations(conn)
+
+    assert rebuild_correlations(conn, before=0, after=600) == 1
+    assert conn.execute("SELECT incident_id, ticket_id FROM incident_ticket_links").fetchall() == [
+        ("I-1", "T-near"),
+    ]
+
+
+def test_lookups_work_both_ways(linked):
+    conn = linked
+    rebuild_correlations(conn)
+
+    tickets = get_tickets_for_incident(conn, "I-1")
+    # Closest first; T-start and T-end are equally far away
+    assert tickets["ticket_id"].iloc[0] == "T-near"
+    assert sorted(zip(tickets["ticket_id"], tickets["lag_seconds"])) == [
+        ("T-end", 3600), ("T-near", 600), ("T-start", -3600),
+    ]
+
+    incidents = get_incidents_for_ticket(conn, "T-near")
+    assert incidents["incident_id"].tolist() == ["I-1", "I-2"]
+    assert get_incidents_for_ticket(conn, "T-early").empty
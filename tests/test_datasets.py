@@ -0,0 +1,44 @@
+from app.data.datasets import load_csv_to_table
+
+HEADER = "ticket_id,priority,description,status,assigned_to,created_at,resolution_time_hours\n"
+
+
+def write_csv(tmp_path, *rows):
+    path = tmp_path / "it_tickets.csv"
+    path.write_text(HEADER + "".join(f"{row},Open,,2024-05-01 09:00:00,\n" for row in rows))
+    return path
+
+
+def quarantined(conn):
+    return conn.execute("SELECT row_number, reasons FROM ingest_quarantine ORDER BY id").fetchall()
+
+
+def test_reloading_a_csv_skips_stored_rows(tmp_path, conn):
+    csv_path = write_csv(tmp_path, "T-1,Low,first", "T-2,Low,second")
+
+    assert load_csv_to_table(conn, csv_path, "it_tickets") == 2
+    assert load_csv_to_table(conn, csv_path, "it_tickets") == 0
+
+    csv_path = write_csv(tmp_path, "T-1,Low,first", "T-2,Low,second", "T-3,Low,third")
+    assert load_csv_to_table(conn, csv_path, "it_tickets") == 1
+    assert quarantined(conn) == []
+
+
+def test_duplicates_within_the_file_are_quarantined(tmp_path, conn):
+    csv_path = write_csv(tmp_path, "T-1,Low,first", "T-2,Low,second", "T-1,Low,again", "T-2,Low,again")
+
+    assert load_csv_to_table(conn, csv_path, "it_tickets", chunksize=3) == 2
+    assert quarantined(conn) == [(4, "duplicate ticket_id"), (5, "duplicate ticket_id")]
+
+
+def test_failed_insert_does_not_mark_later_rows_duplicate(tmp_path, conn):
+    conn.execute(
+        "CREATE TRIGGER reject_bad BEFORE INSERT ON it_tickets WHEN NEW.description = 'bad' "
+        "BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+    )
+    csv_path = write_csv(tmp_path, "T-1,Low,bad", "T-1,Low,good")
+
+    assert load_csv_to_table(conn, csv_path, "it_tickets", chunksize=1) == 1
+    assert conn.execute("SELECT description FROM it_tickets").fetchall() == [("good",)]
+    [(row_number, reasons)] = quarantined(conn)
+    assert row_number == 2 and reasons.startswith("insert failed")
@@ -0,0 +1,63 @@
+import csv
+import gzip
+import json
+
+import pytest
+
+from app.data import exports
+from app.data.db import enable_partitioning, insert_partitioned
+from app.data.exports import export_table
+from app.data.tickets import INSERT_IT_TICKET_SQL
+
+
+def interrupt_after(monkeypatch, batches):
+    """Make the export fail while encoding the batch after `batches` batches."""
+    encode = exports._encode_batch
+    calls = []
+
+    def failing(*args):
+        calls.append(1)
+        if len(calls) > batches:
+            raise KeyboardInterrupt
+        return encode(*args)
+
+    monkeypatch.setattr(exports, "_encode_batch", failing)
+
+
+def test_interrupted_gzip_export_resumes_without_gaps(conn, tmp_path, monkeypatch):
+    conn.executemany(INSERT_IT_TICKET_SQL, [
+        (f"T-{i}", "Low", f"ticket {i}", "Open", None, "2024-05-01 09:00:00", None) for i in range(25)
+    ])
+    conn.commit()
+    dest = tmp_path / "tickets.csv.gz"
+
+    with monkeypatch.context() as patch:
+        interrupt_after(patch, 2)
+        with pytest.raises(KeyboardInterrupt):
+            export_table(conn, "it_tickets", dest, columns=["ticket_id"], batch_size=10)
+    assert not dest.exists()
+
+    stats = export_table(conn, "it_tickets", dest, columns=["ticket_id"], batch_size=10)
+
+    with gzip.open(dest, "rt", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows == [["ticket_id"]] + [[f"T-{i}"] for i in range(25)]
+    assert (stats["rows"], stats["total_rows"]) == (5, 25)
+    assert not (tmp_path / "tickets.csv.gz.part").exists()
+
+
+def test_partitioned_export_resumes_across_partitions(conn, tmp_path, monkeypatch):
+    enable_partitioning(conn, tmp_path / "partitions")
+    for i in range(6):
+        insert_partitioned(conn, "it_tickets", {"ticket_id": f"T-{i}", "created_at": f"{2022 + i % 3}-01-01"})
+    dest = tmp_path / "tickets.jsonl"
+
+    with monkeypatch.context() as patch:
+        interrupt_after(patch, 2)
+        with pytest.raises(KeyboardInterrupt):
+            export_table(conn, "it_tickets", dest, columns=["ticket_id"], batch_size=1)
+
+    export_table(conn, "it_tickets", dest, columns=["ticket_id"], batch_size=1)
+
+    exported = [json.loads(line)["ticket_id"] for line in dest.read_text().splitlines()]
+    assert sorted(exported) == [f"T-{i}" for i in range(6)]
@@ -0,0 +1,36 @@
+from app.data.changes import read_changes
+from app.data.incidents import delete_incident, get_all_incidents, insert_incident, update_incident_status
+
+
+def test_update_and_delete_reach_the_change_log(conn):
+    incident_id = insert_incident(conn, "2024-11-05 10:00:00", "Phishing", "Low", "Open", "test", "alice")
+
+    assert update_incident_status(conn, incident_id, "Resolved") == 1
+    assert conn.execute(
+        "SELECT status FROM cyber_incidents WHERE incident_id = ?", (incident_id,)
+    ).fetchone() == ("Resolved",)
+    assert delete_incident(conn, incident_id) == 1
+
+    changes = [(c["op"], c["key"], c["data"]["status"]) for c in read_changes(conn)]
+    assert changes == [("I", incident_id, "Open"), ("U", incident_id, "Resolved"), ("D", incident_id, "Resolved")]
+
+
+def test_insert_incident_numbers_after_the_highest_id(conn):
+    insert_incident(conn, "2024-11-05", "Malware", "Low", "Open", "csv row", incident_id=1041)
+
+    assert insert_incident(conn, "2024-11-06", "Malware", "Low", "Open", "next") == "1042"
+    assert update_incident_status(conn, 1041, "Closed") == 1
+    assert delete_incident(conn, "missing") == 0
+
+
+def test_typed_read_matches_the_default_read(conn):
+    insert_incident(conn, "2024-11-05 10:00:00", "Phishing", "Low", "Open", "a")
+    insert_incident(conn, "2024-11-06 11:30:00", "Malware", "High", "Closed", "b")
+
+    plain = get_all_incidents(conn)
+    typed = get_all_incidents(conn, typed=True)
+
+    assert typed["status"].dtype == "category"
+    assert str(typed["timestamp"].dtype) == "datetime64[ns]"
+    assert typed["status"].astype(str).tolist() == plain["status"].tolist()
+    assert typed["timestamp"].dt.strftime("%Y-%m-%d %H:%M:%S").tolist() == plain["timestamp"].tolist()
@@ -0,0 +1,57 @@
+import json
+
+from app.data.db import connect_database
+from app.data.tickets import INSERT_IT_TICKET_SQL
+from app.services.ingest_service import IngestService
+
+
+def test_submit_helpers_write_to_real_schema(db_path):
+    with IngestService(db_path) as service:
+        incident = service.submit_incident(
+            "9001", "2024-05-01 10:00:00", "High", "Phishing", "Open", "Suspicious mail", "alice"
+        )
+        ticket = service.submit_ticket("T-1", "High", "Reset password", assigned_to="IT_Support_A")
+        assert incident.result(timeout=5) > 0
+        assert ticket.result(timeout=5) > 0
+
+    conn = connect_database(db_path)
+    assert conn.execute(
+        "SELECT category, status, reported_by FROM cyber_incidents WHERE incident_id = '9001'"
+    ).fetchone() == ("Phishing", "Open", "alice")
+    assert conn.execute(
+        "SELECT priority, status, assigned_to, created_at IS NOT NULL FROM it_tickets WHERE ticket_id = 'T-1'"
+    ).fetchone() == ("High", "Open", "IT_Support_A", 1)
+    conn.close()
+
+
+def test_constraint_error_only_fails_its_own_future(db_path):
+    with IngestService(db_path) as service:
+        first = service.submit_ticket("T-1", "Low", "first")
+        duplicate = service.submit_ticket("T-1", "Low", "duplicate")
+        other = service.submit_ticket("T-2", "Low", "other")
+        first.result(timeout=5)
+        other.result(timeout=5)
+        assert duplicate.exception(timeout=5) is not None
+
+    conn = connect_database(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM it_tickets").fetchone()[0] == 2
+    conn.close()
+
+
+def test_spool_replays_uncommitted_writes(tmp_path, db_path):
+    spool = tmp_path / "ingest.spool"
+    record = {
+        "seq": 1,
+        "sql": INSERT_IT_TICKET_SQL,
+        "params": ["T-9", "Medium", "queued before crash", "Open", None, "2024-05-01 10:00:00", None],
+        "table": "it_tickets",
+    }
+    spool.write_text(json.dumps(record) + "\n")
+
+    with IngestService(db_path, spool_path=spool):
+        pass
+
+    conn = connect_database(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM it_tickets WHERE ticket_id = 'T-9'").fetchone()[0] == 1
+    conn.close()
+    assert spool.read_text() == ""
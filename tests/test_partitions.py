@@ -0,0 +1,168 @@
+import sqlite3
+
+import pytest
+
+from app.data.changes import read_changes
+from app.data.correlation import get_tickets_for_incident, rebuild_correlations
+from app.data.datasets import load_csv_to_table
+from app.data.db import (
+    MAX_ATTACHED_PARTITIONS, archive_partition, attached_partitions, connect_database,
+    enable_partitioning, insert_partitioned,
+)
+from app.data.exports import export_table
+from app.data.incidents import (
+    delete_incident, get_incidents_by_type_count, insert_incident, update_incident_status,
+)
+from app.data.snapshots import create_snapshot, open_snapshot
+from app.data.tickets import create_ticket, delete_ticket, get_ticket_by_id, patch_tickets, update_ticket
+from app.services.ingest_service import IngestService
+
+
+@pytest.fixture
+def db(db_path, tmp_path):
+    return db_path, tmp_path / "partitions"
+
+
+def ticket(ticket_id, created_at):
+    return {"ticket_id": ticket_id, "priority": "Low", "status": "Open", "created_at": created_at}
+
+
+def test_views_cover_every_month(db):
+    path, partition_dir = db
+    conn = connect_database(path)
+    enable_partitioning(conn, partition_dir)
+
+    for month in range(1, 13):
+        insert_partitioned(conn, "it_tickets", ticket(f"T-{month}", f"2024-{month:02d}-01 09:00:00"),
+                           partition_dir)
+
+    assert conn.execute("SELECT COUNT(*) FROM it_tickets_all").fetchone()[0] == 12
+    assert attached_partitions(conn) == ["p2024"]
+    conn.close()
+
+
+def test_attach_limit_fails_instead_of_dropping_partitions(db):
+    path, partition_dir = db
+    conn = connect_database(path)
+    enable_partitioning(conn, partition_dir)
+    years = range(2024 - MAX_ATTACHED_PARTITIONS + 1, 2025)
+    for year in years:
+        insert_partitioned(conn, "it_tickets", ticket(f"T-{year}", f"{year}-01-01"), partition_dir)
+
+    with pytest.raises(RuntimeError):
+        insert_partitioned(conn, "it_tickets", ticket("T-old", "2000-01-01"), partition_dir)
+    assert conn.execute("SELECT COUNT(*) FROM it_tickets_all").fetchone()[0] == len(years)
+
+    (partition_dir / "p2000.db").touch()
+    other = connect_database(path)
+    with pytest.raises(RuntimeError):
+        enable_partitioning(other, partition_dir)
+
+    (partition_dir / "p2000.db").unlink()
+    archive_partition(conn, f"p{years[0]}", partition_dir, partition_dir / "archive")
+    enable_partitioning(other, partition_dir)
+    assert other.execute("SELECT COUNT(*) FROM it_tickets_all").fetchone()[0] == len(years) - 1
+    other.close()
+    conn.close()
+
+
+def test_partitions_keep_indexes_keys_and_change_log(db):
+    path, partition_dir = db
+    conn = connect_database(path)
+    insert_partitioned(conn, "it_tickets", ticket("T-1", "2023-05-01"), partition_dir)
+
+    with pytest.raises(sqlite3.IntegrityError):
+        insert_partitioned(conn, "it_tickets", ticket("T-1", "2024-05-01"), partition_dir)
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("INSERT INTO it_tickets (ticket_id) VALUES ('T-1')")
+    conn.rollback()
+
+    indexes = {row[0] for row in conn.execute('SELECT name FROM "p2023".sqlite_master WHERE type = \'index\'')}
+    assert {"idx_it_tickets_assigned_to", "idx_it_tickets_created_at"} <= indexes
+    assert [(c["table"], c["op"], c["key"]) for c in read_changes(conn)] == [("it_tickets", "I", "T-1")]
+    conn.close()
+
+
+def test_insert_incident_and_analytics_use_partitions(db):
+    path, partition_dir = db
+    conn = connect_database(path)
+    enable_partitioning(conn, partition_dir)
+
+    insert_incident(conn, "2024-03-01 10:00:00", "Phishing", "High", "Open", "test", incident_id="I-1")
+
+    assert conn.execute('SELECT COUNT(*) FROM "p2024".cyber_incidents').fetchone()[0] == 1
+    assert conn.execute("SELECT COUNT(*) FROM main.cyber_incidents").fetchone()[0] == 0
+    counts = get_incidents_by_type_count(conn)
+    assert counts.to_dict("records") == [{"category": "Phishing", "count": 1}]
+    conn.close()
+
+
+def test_ingest_service_routes_rows(db):
+    path, partition_dir = db
+
+    with IngestService(path, partition_dir=partition_dir) as service:
+        first = service.submit_ticket("T-1", "Low", "first", created_at="2023-02-01 09:00:00")
+        second = service.submit_ticket("T-2", "Low", "second", created_at="2024-02-01 09:00:00")
+        duplicate = service.submit_ticket("T-1", "Low", "again", created_at="2024-03-01 09:00:00")
+        first.result(timeout=5)
+        second.result(timeout=5)
+        assert isinstance(duplicate.exception(timeout=5), sqlite3.IntegrityError)
+
+    conn = connect_database(path)
+    enable_partitioning(conn, partition_dir)
+    assert conn.execute(
+        "SELECT ticket_id FROM it_tickets_all ORDER BY ticket_id"
+    ).fetchall() == [("T-1",), ("T-2",)]
+    assert conn.execute("SELECT COUNT(*) FROM main.it_tickets").fetchone()[0] == 0
+    conn.close()
+
+
+def test_cache_keeps_partitioned_and_plain_connections_apart(db):
+    path, partition_dir = db
+    partitioned = connect_database(path)
+    enable_partitioning(partitioned, partition_dir)
+    insert_incident(partitioned, "2023-03-01 10:00:00", "Phishing", "High", "Open", "old", incident_id="I-1")
+    plain = connect_database(path)
+
+    assert get_incidents_by_type_count(plain).empty
+    assert get_incidents_by_type_count(partitioned)["count"].tolist() == [1]
+    assert get_incidents_by_type_count(plain).empty
+    plain.close()
+    partitioned.close()
+
+
+def test_updates_deletes_and_reads_reach_partitions(db, tmp_path):
+    path, partition_dir = db
+    conn = connect_database(path)
+    enable_partitioning(conn, partition_dir)
+    insert_incident(conn, "2023-05-01 10:30:00", "Phishing", "High", "Open", "old", incident_id="I-1")
+    create_ticket("first", ticket_id="T-1", created_at="2023-05-01 10:00:00", conn=conn)
+    create_ticket("second", ticket_id="T-2", created_at="2024-05-01 10:00:00", conn=conn)
+    assert conn.execute("SELECT COUNT(*) FROM main.it_tickets").fetchone()[0] == 0
+
+    assert patch_tickets([("T-1", {"status": "Closed"}, 0)], conn=conn) == [("T-1", "updated", 1)]
+    assert update_ticket("T-2", priority="High", conn=conn)
+    assert get_ticket_by_id("T-2", conn)[1] == "High"
+    assert update_incident_status(conn, "I-1", "Closed") == 1
+
+    assert rebuild_correlations(conn) == 1
+    assert get_tickets_for_incident(conn, "I-1")["ticket_id"].tolist() == ["T-1"]
+    assert export_table(conn, "it_tickets", tmp_path / "tickets.csv")["rows"] == 2
+
+    csv_path = tmp_path / "it_tickets.csv"
+    csv_path.write_text("ticket_id,priority,description,status,assigned_to,created_at,resolution_time_hours\n"
+                        "T-1,Low,first,Open,,2023-05-01 10:00:00,\n")
+    assert load_csv_to_table(conn, csv_path, "it_tickets") == 0
+
+    snapshot = open_snapshot(create_snapshot(path, tmp_path / "snapshots", partition_dir=partition_dir))
+    assert snapshot.execute("SELECT COUNT(*) FROM it_tickets").fetchone()[0] == 2
+    assert snapshot.execute("SELECT status FROM cyber_incidents").fetchall() == [("Closed",)]
+    snapshot.close()
+
+    assert delete_ticket("T-1", conn)
+    assert delete_incident(conn, "I-1") == 1
+    assert conn.execute("SELECT ticket_id FROM it_tickets_all").fetchall() == [("T-2",)]
+    assert [(c["op"], c["key"]) for c in read_changes(conn) if c["op"] != "I"] == [
+        ("U", "T-1"), ("U", "T-2"), ("U", "I-1"), ("D", "T-1"), ("D", "I-1"),
+    ]
+    conn.close()
@@ -0,0 +1,25 @@
+from app.data import incidents
+from app.data.planner import check_query_plans
+
+
+def stored_plans(conn):
+    return dict(conn.execute("SELECT query_name, plan FROM plan_snapshots"))
+
+
+def test_analytic_queries_plan_against_the_schema(conn):
+    assert check_query_plans(conn) == []
+    plans = stored_plans(conn)
+    assert len(plans) == 2 * len(incidents.ANALYTIC_QUERIES)
+    assert not any("ERROR" in plan for plan in plans.values())
+
+
+def test_planning_error_is_a_regression_and_not_stored(monkeypatch, conn):
+    monkeypatch.setitem(
+        incidents.ANALYTIC_QUERIES, "broken",
+        ("SELECT no_such_column FROM cyber_incidents{where}", (), ())
+    )
+
+    regressions = check_query_plans(conn)
+
+    assert [message.split(":")[0] for message in regressions] == ["broken", "broken"]
+    assert "broken" not in stored_plans(conn)
@@ -0,0 +1,54 @@
+import json
+
+from app.services.scheduler import Job, Scheduler
+
+
+def test_overlapping_run_is_skipped(tmp_path):
+    scheduler = Scheduler(status_path=tmp_path / "status.json")
+    inner = []
+    scheduler.add_job("sync", lambda: inner.append(scheduler.run_job("sync")), 60)
+
+    assert scheduler.run_job("sync")
+    assert inner == [False]
+
+    stats = json.loads((tmp_path / "status.json").read_text())["sync"]
+    assert (stats["runs"], stats["skipped"], stats["running"]) == (1, 1, False)
+
+
+def test_failures_are_recorded_and_do_not_stop_the_job():
+    scheduler = Scheduler()
+
+    def broken():
+        raise ValueError("boom")
+
+    scheduler.add_job("broken", broken, 60)
+
+    assert not scheduler.run_job("broken")
+    assert not scheduler.run_job("broken")
+    stats = scheduler.get_stats()["broken"]
+    assert (stats["runs"], stats["failures"], stats["last_error"]) == (2, 2, "ValueError: boom")
+    assert stats["last_success"] is None
+
+
+def test_next_run_stays_within_the_jitter():
+    job = Job("job", lambda: None, 100, 0.1)
+    for _ in range(200):
+        job.schedule_next(1000.0)
+        assert 1090.0 <= job.next_run <= 1110.0
+
+
+def test_run_starts_due_jobs_until_stopped():
+    scheduler = Scheduler()
+    runs = []
+    scheduler.add_job("later", lambda: runs.append("later"), 3600)
+
+    def first():
+        runs.append("first")
+        scheduler.stop()
+
+    scheduler.add_job("first", first, 3600, run_at_start=True)
+
+    scheduler.run()
+
+    assert runs == ["first"]
+    assert scheduler.get_stats()["later"]["next_run_in"] > 3000
@@ -0,0 +1,59 @@
+import sqlite3
+
+import pytest
+
+from app.data.incidents import insert_incident
+from app.data.snapshots import (
+    create_snapshot, latest_snapshot, list_snapshots, open_snapshot, run_parallel_analytics,
+)
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path):
+    return tmp_path / "snapshots"
+
+
+def snapshot(db_path, snapshot_dir, keep=3):
+    return create_snapshot(db_path, snapshot_dir, keep=keep, partition_dir=snapshot_dir / "no-partitions")
+
+
+def test_snapshots_are_point_in_time_and_rotated(db_path, conn, snapshot_dir):
+    insert_incident(conn, "2024-05-01 09:00:00", "Phishing", "High", "Open", "first", incident_id="I-1")
+    first = snapshot(db_path, snapshot_dir)
+    insert_incident(conn, "2024-05-02 09:00:00", "Malware", "Low", "Open", "second", incident_id="I-2")
+
+    old = open_snapshot(first)
+    assert old.execute("SELECT incident_id FROM cyber_incidents").fetchall() == [("I-1",)]
+    old.close()
+
+    paths = [first] + [snapshot(db_path, snapshot_dir, keep=2) for _ in range(2)]
+    assert list_snapshots(snapshot_dir) == paths[1:]
+    assert latest_snapshot(snapshot_dir) == paths[-1]
+    assert not first.exists() and not list(snapshot_dir.glob("*.part"))
+
+    latest = open_snapshot(snapshot_dir=snapshot_dir)
+    assert latest.execute("SELECT COUNT(*) FROM cyber_incidents").fetchone()[0] == 2
+    with pytest.raises(sqlite3.OperationalError):
+        latest.execute("DELETE FROM cyber_incidents")
+    latest.close()
+
+
+def test_parallel_analytics_run_on_the_snapshot(db_path, conn, snapshot_dir):
+    for i, category in enumerate(["Phishing", "Phishing", "Malware"]):
+        insert_incident(conn, "2024-05-01 09:00:00", category, "High", "Open", "test", incident_id=f"I-{i}")
+    snapshot(db_path, snapshot_dir)
+    insert_incident(conn, "2024-05-01 09:00:00", "Malware", "High", "Open", "later", incident_id="I-9")
+
+    results, age = run_parallel_analytics({
+        "by_type": ("get_incidents_by_type_count", {}),
+        "many": ("get_incident_types_with_many_cases", {"min_count": 1}),
+    }, snapshot_dir=snapshot_dir, max_workers=2)
+
+    assert results["by_type"].to_dict("records") == [
+        {"category": "Phishing", "count": 2}, {"category": "Malware", "count": 1},
+    ]
+    assert results["many"]["category"].tolist() == ["Phishing"]
+    assert age >= 0
+
+    with pytest.raises(ValueError):
+        run_parallel_analytics({"bad": ("delete_incident", {})}, snapshot_dir=snapshot_dir)
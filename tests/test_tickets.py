@@ -0,0 +1,79 @@
+import pytest
+
+from app.data.db import connect_database
+from app.data.schema import create_all_tables
+from app.data.tickets import (
+    INSERT_IT_TICKET_SQL, create_ticket, delete_ticket, get_all_tickets, get_ticket_by_id,
+    patch_tickets, update_ticket,
+)
+
+
+@pytest.fixture
+def tickets(conn):
+    conn.executemany(INSERT_IT_TICKET_SQL, [
+        ("T-1", "Low", "Printer jam", "Open", None, "2024-05-01 09:00:00", None),
+        ("T-2", "High", "VPN down", "Open", "IT_Support_A", "2024-05-01 10:00:00", None),
+    ])
+    conn.commit()
+    return conn
+
+
+def test_patch_tickets_updates_it_tickets(tickets):
+    conn = tickets
+    outcomes = patch_tickets([
+        ("T-1", {"assigned_to": "IT_Support_B", "status": "In Progress"}),
+        ("T-2", {"status": "Resolved"}, 0),
+        ("T-3", {"status": "Resolved"}),
+    ], conn=conn)
+
+    assert outcomes == [("T-1", "updated", 1), ("T-2", "updated", 1), ("T-3", "not_found", None)]
+    assert conn.execute(
+        "SELECT assigned_to, status, version FROM it_tickets WHERE ticket_id = 'T-1'"
+    ).fetchone() == ("IT_Support_B", "In Progress", 1)
+
+
+def test_patch_tickets_detects_conflicts(tickets):
+    conn = tickets
+    patch_tickets([("T-1", {"priority": "High"})], conn=conn)
+
+    outcomes = patch_tickets([("T-1", {"priority": "Low"}, 0)], conn=conn)
+
+    assert outcomes == [("T-1", "conflict", 1)]
+    assert conn.execute("SELECT priority FROM it_tickets WHERE ticket_id = 'T-1'").fetchone() == ("High",)
+
+
+def test_version_column_added_to_older_databases(tmp_path):
+    conn = connect_database(tmp_path / "old.db")
+    conn.execute(
+        "CREATE TABLE it_tickets (ticket_id TEXT UNIQUE NOT NULL, priority TEXT, description TEXT, "
+        "status TEXT, assigned_to TEXT, created_at TEXT, resolution_time_hours REAL, "
+        "inserted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    )
+    conn.execute("INSERT INTO it_tickets (ticket_id, status) VALUES ('T-1', 'Open')")
+    conn.execute("PRAGMA user_version = 7")
+    conn.commit()
+
+    create_all_tables(conn)
+
+    assert patch_tickets([("T-1", {"status": "Closed"}, 0)], conn=conn) == [("T-1", "updated", 1)]
+    conn.close()
+
+
+def test_ticket_crud_uses_it_tickets(tickets):
+    conn = tickets
+
+    ticket_id = create_ticket("Laptop broken", priority="High", assigned_to="IT_Support_A", conn=conn)
+    assert ticket_id == "1"
+    assert create_ticket("Named", ticket_id="T-9", conn=conn) == "T-9"
+    assert len(get_all_tickets(conn)) == 4
+
+    assert update_ticket(ticket_id, status="Resolved", conn=conn)
+    row = conn.execute(
+        "SELECT priority, status, assigned_to, version FROM it_tickets WHERE ticket_id = ?", (ticket_id,)
+    ).fetchone()
+    assert row == ("High", "Resolved", "IT_Support_A", 1)
+    assert get_ticket_by_id(ticket_id, conn)[0] == ticket_id
+
+    assert delete_ticket(ticket_id, conn)
+    assert not delete_ticket(ticket_id, conn)
+    assert get_ticket_by_id(ticket_id, conn) is None